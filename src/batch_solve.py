@@ -0,0 +1,137 @@
+"""
+Headless batch solver : solves many grids against one warm dictionary.
+
+Only the search modules are imported (no GUI, OCR or automation), so it starts
+fast and runs anywhere, including Linux servers.
+
+Usage (from the src directory):
+    python batch_solve.py grids.txt > results.jsonl
+    cat grids.jsonl | python batch_solve.py --engine iterative
+
+Input, read from a file or stdin :
+    - JSONL : one grid per line, either a list of rows or an object {"id": ..., "grid": [...]}.
+      A row is a list of cells (["qu", "a", ...]) or a string with one letter per cell.
+    - Text : grids separated by blank lines, one row per line, cells separated by spaces
+      ("qu a t e") or written one letter per cell ("qate").
+
+Output : one JSON object per grid on stdout, with its words sorted longest first,
+then the throughput on stderr.
+"""
+import argparse
+import json
+import sys
+import time
+from typing import Iterator, List, TextIO
+
+from core.word_box_solver_algo import Trie, WordBoxSolver, WORD_LIST_PATH
+
+
+def parse_row(row : str | List[str]) -> List[str]:
+    """ Splits a row into lowercase cells """
+    if (isinstance(row, str)):
+        row = row.split() if " " in row.strip() else list(row.strip())
+    return [cell.lower() for cell in row]
+
+
+def read_grids(stream : TextIO) -> Iterator[tuple[object, List[List[str]] | None, str]]:
+    """
+    Yields (id, grid, error) for every grid of the stream, the grid is None on a parse error.
+    Grids without an id are numbered from 0 in reading order.
+    """
+    count : int = 0
+    rows : List[str] = []
+
+    def text_grid():
+        nonlocal count
+        grid_id = count
+        count += 1
+        return (grid_id, [parse_row(row) for row in rows], "")
+
+    for line in stream:
+        line = line.strip()
+
+        if (line.startswith("[") or line.startswith("{")):
+            if (rows):
+                yield text_grid()
+                rows = []
+            grid_id = count
+            count += 1
+            try:
+                data = json.loads(line)
+                if (isinstance(data, dict)):
+                    grid_id = data.get("id", grid_id)
+                    data = data["grid"]
+                yield (grid_id, [parse_row(row) for row in data], "")
+            except (ValueError, KeyError, TypeError, AttributeError) as error:
+                yield (grid_id, None, f"Invalid grid: {error}")
+            continue
+
+        if (line == ""):
+            if (rows):
+                yield text_grid()
+                rows = []
+            continue
+
+        rows.append(line)
+
+    if (rows):
+        yield text_grid()
+
+
+def validate_grid(grid : List[List[str]]) -> str:
+    """ Returns an error message if the grid can't be solved, or an empty string """
+    if (len(grid) < 2 or any(len(row) != len(grid[0]) for row in grid)):
+        return "The grid must have at least 2 rows of the same length"
+    if (not all(cell.isascii() and cell.isalpha() for row in grid for cell in row)):
+        return "Every cell must hold ascii letters"
+    return ""
+
+
+def main(argv : List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Solve Word Box grids from a file or stdin and stream JSONL results")
+    parser.add_argument("input", nargs="?", default="-", help="File of grids, stdin by default")
+    parser.add_argument("--words", default=WORD_LIST_PATH, help="Json word list (compiled on first use)")
+    parser.add_argument("--engine", default="iterative", choices=["recursive", "iterative", "vector"])
+    parser.add_argument("--workers", type=int, default=1, help="Processes searching the start cells of a grid")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    solver = WordBoxSolver(Trie.load(args.words))
+    load_time : float = time.perf_counter() - start
+
+    stream : TextIO = sys.stdin if args.input == "-" else open(args.input, "r")
+    solved : int = 0
+    solve_time : float = 0
+    try:
+        for grid_id, grid, error in read_grids(stream):
+            error = error or validate_grid(grid)
+            if (error):
+                print(json.dumps({"id": grid_id, "error": error}), flush=True)
+                continue
+
+            start = time.perf_counter()
+            found_words = solver.find_words(grid, args.engine, workers=args.workers)
+            elapsed : float = time.perf_counter() - start
+
+            solved += 1
+            solve_time += elapsed
+            words = sorted(found_words.items(), key=lambda x: len(x[0][0]), reverse=True)
+            print(json.dumps({
+                "id": grid_id,
+                "count": len(words),
+                "ms": round(elapsed * 1000, 3),
+                "words": [{"word": word, "path": path.tolist()} for (word, _), path in words],
+            }), flush=True)
+    finally:
+        if (stream is not sys.stdin):
+            stream.close()
+        solver.close()
+
+    rate : float = solved / solve_time if solve_time > 0 else 0.0
+    print(f"Loaded dictionary in {load_time * 1000:.1f} ms, solved {solved} grids in {solve_time:.3f} s ({rate:.1f} grids/s)",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Scan benchmark : times the image pipeline (capture, contours, OCR) on saved screenshots.
+
+Frames come from `ImageFileCapture`, so no game window nor Windows API is needed.
+Each image is scanned several times after one untimed warm-up scan, and the
+latency of every step is reported by the size of the grid that was read.
+
+By default every scan starts with an empty glyph cache and a classifier without templates, so
+each glyph reaches EasyOCR and the OCR modes are compared on the same work. The
+learned glyph files of the app are never read nor written.
+
+Usage (from the src directory):
+    python benchmark_scan.py screenshots/ --runs 5
+    python benchmark_scan.py screenshots/ --ocr-mode frame
+    python benchmark_scan.py screenshots/ --classifier fonts --glyph-cache
+"""
+import argparse
+import copy
+import sys
+from statistics import median
+from types import SimpleNamespace
+from typing import Dict, List
+
+from core.word_box_solver_capture import ImageFileCapture
+from core.word_box_solver_glyphs import GlyphCache, GlyphClassifier
+from core.word_box_solver_img_processing import ImgProcessing
+
+
+def main(argv : List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Time the scan pipeline on screenshots of boards")
+    parser.add_argument("images", help="A screenshot or a directory of screenshots")
+    parser.add_argument("--runs", type=int, default=5, help="Timed scans per image")
+    parser.add_argument("--ocr-mode", default="crops", choices=["crops", "frame"], help="See ImgProcessing")
+    parser.add_argument("--classifier", default="none", choices=["none", "fonts"],
+                        help="Templates of the glyph classifier at the start of every scan, none or rendered from the fonts")
+    parser.add_argument("--glyph-cache", action="store_true",
+                        help="Keep the glyph cache (in memory) between the scans of an image, to time the cached path")
+    args = parser.parse_args(argv)
+
+    capture = ImageFileCapture(args.images, loop=False)
+    app = SimpleNamespace(is_scanning=False)
+    templates : GlyphClassifier = GlyphClassifier.from_fonts() if args.classifier == "fonts" else GlyphClassifier()
+    processing = ImgProcessing(app, capture, args.ocr_mode, classifier=templates, glyphs_path=None, glyph_cache=GlyphCache())
+
+    timings : Dict[str, Dict[str, List[float]]] = {}
+    for path in capture.paths:
+        processing.glyph_cache = GlyphCache()
+        for run in range(args.runs + 1):
+            processing.capture = ImageFileCapture(path)
+            # Glyphs learned by an earlier scan would skip the OCR
+            processing.classifier = copy.deepcopy(templates)
+            if (not args.glyph_cache):
+                processing.glyph_cache = GlyphCache()
+            processing.pipeline()
+            if (run == 0):
+                continue
+
+            grid = processing.contour_info_grid
+            board : str = f"{len(grid)}x{len(grid[0])}" if grid else "no grid"
+            for step, seconds in processing.timings.items():
+                timings.setdefault(board, {}).setdefault(step, []).append(seconds)
+
+    for board, steps in sorted(timings.items()):
+        report : str = ", ".join(f"{step} {median(values) * 1000:.1f} ms" for step, values in steps.items())
+        print(f"{board} ({len(steps['total'])} scans): {report}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
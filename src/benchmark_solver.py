@@ -0,0 +1,261 @@
+"""
+Solver benchmark : times the dictionary and the search on reproducible synthetic grids.
+
+Grids are drawn from a seeded generator with English letter frequencies, from 4x4
+up to 12x12, optionally with multi-letter tiles. Only the search modules are imported,
+like `batch_solve.py`, so it runs headless.
+
+Usage (from the src directory):
+    python benchmark_solver.py --save baseline.json
+    python benchmark_solver.py --compare baseline.json
+
+Tracked metrics, lower is better :
+    - build_ms, build_peak_kb : compiling the trie from the word list
+    - load_ms : mapping the compiled dictionary
+    - per grid size : p50_ms, p99_ms (over the fastest of --repeats solves of every grid),
+      expansions (neighbor cells tried by the search), peak_kb (traced Python allocations while solving)
+
+Timings are never taken while tracemalloc traces, the memory peaks come from separate runs.
+
+With --compare, the run fails (exit code 1) and prints every metric which got
+worse than the baseline by more than the tolerance. Search counts are deterministic
+so they get no tolerance, timings which grew by less than MIN_TIMING_DELTA_MS are ignored.
+"""
+import argparse
+import gc
+import json
+import math
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+from core.word_box_solver_algo import SolveState, Trie, WordBoxSolver, WORD_LIST_PATH, load_word_list
+from core.word_box_solver_dictionary import source_checksum
+
+# Relative frequency of the letters in English text, in percent
+LETTER_FREQUENCIES : Dict[str, float] = {
+    "e": 12.7, "t": 9.1, "a": 8.2, "o": 7.5, "i": 7.0, "n": 6.7, "s": 6.3, "h": 6.1, "r": 6.0,
+    "d": 4.3, "l": 4.0, "c": 2.8, "u": 2.8, "m": 2.4, "w": 2.4, "f": 2.2, "g": 2.0, "y": 2.0,
+    "p": 1.9, "b": 1.5, "v": 1.0, "k": 0.8, "j": 0.2, "x": 0.2, "q": 0.1, "z": 0.1,
+}
+
+# Tiles holding several letters, drawn in place of a single letter
+MULTI_LETTER_TILES : List[str] = ["qu", "th", "er", "in", "an", "he", "re", "on"]
+
+GRID_SIZES : List[int] = [4, 6, 8, 10, 12]
+
+# Metrics compared exactly, the others are timings or memory and get a tolerance
+EXACT_METRICS : set[str] = {"expansions"}
+
+# Slowdowns of a timing below this many milliseconds are noise, whatever their relative size
+MIN_TIMING_DELTA_MS : float = 0.5
+
+
+def generate_grid(rng : random.Random, rowSize : int, colSize : int, tile_rate : float = 0.0) -> List[List[str]]:
+    """
+    Draws a grid of letters with English frequencies
+
+    Args:
+        rng: The seeded generator
+        rowSize, colSize: Size of the grid
+        tile_rate: Probability of a cell holding a multi-letter tile
+    """
+    letters : List[str] = list(LETTER_FREQUENCIES)
+    weights : List[float] = list(LETTER_FREQUENCIES.values())
+    grid : List[List[str]] = []
+    for _ in range(rowSize):
+        row : List[str] = []
+        for _ in range(colSize):
+            if (tile_rate and rng.random() < tile_rate):
+                row.append(rng.choice(MULTI_LETTER_TILES))
+            else:
+                row.append(rng.choices(letters, weights)[0])
+        grid.append(row)
+    return grid
+
+
+def percentile(values : List[float], rank : float) -> float:
+    """ Nearest-rank percentile of a list of values """
+    ordered : List[float] = sorted(values)
+    index : int = max(0, math.ceil(rank / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def benchmark_dictionary(words_path : str, repeats : int = 1) -> tuple[Dict[str, float], Trie]:
+    """ Times the trie compilation and the mapping of the compiled dictionary, the fastest of `repeats` runs of each """
+    words : List[str] = load_word_list(words_path)
+
+    # Tracing slows the build down by an order of magnitude, it gets a run of its own
+    build_times : List[float] = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        trie = Trie(words)
+        trie.createTrie()
+        build_times.append((time.perf_counter() - start) * 1000)
+    build_ms : float = min(build_times)
+
+    tracemalloc.start()
+    Trie(words).createTrie()
+    build_peak : int = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    with tempfile.TemporaryDirectory() as directory:
+        artifact : Path = Path(directory) / "benchmark.wbdict"
+        Trie.compile(words_path, artifact)
+        load_times : List[float] = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            mapped = Trie.load(words_path, artifact)
+            load_times.append((time.perf_counter() - start) * 1000)
+            del mapped
+        load_ms : float = min(load_times)
+
+    metrics : Dict[str, float] = {
+        "build_ms": round(build_ms, 3),
+        "build_peak_kb": round(build_peak / 1024, 1),
+        "load_ms": round(load_ms, 3),
+    }
+    return metrics, trie
+
+
+def benchmark_solves(solver : WordBoxSolver, grids : List[List[List[str]]], engine : str, repeats : int = 1) -> Dict[str, float]:
+    """
+    Solves every grid `repeats` times and keeps its fastest time, which filters out
+    the noise of the machine. An untimed warm-up comes first, then one more solve
+    of every grid under tracemalloc for the memory peak.
+    """
+    solver.find_words(grids[0], engine)
+
+    timings : List[float] = []
+    expansions : int = 0
+    for grid in grids:
+        state = SolveState()
+        solver.find_words(grid, engine, state=state)
+        expansions += state.expansions
+
+        times : List[float] = []
+        gc.disable() # like timeit, a collection mustn't land in a single timing
+        try:
+            for _ in range(repeats):
+                start = time.perf_counter()
+                solver.find_words(grid, engine)
+                times.append((time.perf_counter() - start) * 1000)
+        finally:
+            gc.enable()
+        timings.append(min(times))
+
+    tracemalloc.start()
+    for grid in grids:
+        solver.find_words(grid, engine)
+    peak : int = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "expansions": expansions,
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def flatten(results : dict, prefix : str = "") -> Dict[str, float]:
+    """ Metric name (with its grid size) to value """
+    metrics : Dict[str, float] = {}
+    for name, value in results.items():
+        if (isinstance(value, dict)):
+            metrics.update(flatten(value, f"{prefix}{name}."))
+        else:
+            metrics[f"{prefix}{name}"] = value
+    return metrics
+
+
+def compare(results : dict, baseline : dict, tolerance : float) -> List[str]:
+    """
+    Lists the metrics which got worse than the baseline
+
+    Args:
+        results: The results of this run
+        baseline: Previously saved results of the same configuration
+        tolerance: Allowed relative increase of the timings and memory
+
+    Returns:
+        One line per regression, empty if none
+    """
+    if (results["config"] != baseline["config"]):
+        return [f"The baseline was recorded with another configuration: {baseline['config']}"]
+
+    current : Dict[str, float] = flatten(results["metrics"])
+    regressions : List[str] = []
+    for name, previous in flatten(baseline["metrics"]).items():
+        value = current.get(name)
+        if (value is None):
+            continue
+        allowed : float = 0.0 if name.split(".")[-1] in EXACT_METRICS else tolerance
+        if (name.endswith("_ms") and value - previous < MIN_TIMING_DELTA_MS):
+            continue
+        if (value > previous * (1 + allowed)):
+            change : str = f"{(value - previous) / previous:+.1%}" if previous else "new"
+            regressions.append(f"{name}: {previous} -> {value} ({change}, allowed +{allowed:.0%})")
+    return regressions
+
+
+def main(argv : List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the solver on seeded synthetic grids")
+    parser.add_argument("--words", default=WORD_LIST_PATH, help="Json word list")
+    parser.add_argument("--engine", default="iterative", choices=["recursive", "iterative", "vector"])
+    parser.add_argument("--sizes", type=int, nargs="+", default=GRID_SIZES, help="Square grid sizes")
+    parser.add_argument("--grids", type=int, default=20, help="Grids per size")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs of every grid, the fastest is kept")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tile-rate", type=float, default=0.0, help="Probability of a multi-letter tile per cell")
+    parser.add_argument("--save", help="Write the results as a JSON baseline")
+    parser.add_argument("--compare", help="Fail if a metric got worse than this JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed relative slowdown of timings and memory")
+    args = parser.parse_args(argv)
+
+    dictionary_metrics, trie = benchmark_dictionary(args.words, args.repeats)
+    solver = WordBoxSolver(trie)
+
+    metrics : dict = {"dictionary": dictionary_metrics}
+    rng = random.Random(args.seed)
+    for size in args.sizes:
+        grids = [generate_grid(rng, size, size, args.tile_rate) for _ in range(args.grids)]
+        metrics[f"{size}x{size}"] = benchmark_solves(solver, grids, args.engine, args.repeats)
+        print(f"{size}x{size}: {metrics[f'{size}x{size}']}", file=sys.stderr)
+
+    results : dict = {
+        "config": {
+            "words": source_checksum(args.words).hex(),
+            "engine": args.engine,
+            "sizes": args.sizes,
+            "grids": args.grids,
+            "repeats": args.repeats,
+            "seed": args.seed,
+            "tile_rate": args.tile_rate,
+        },
+        "metrics": metrics,
+    }
+    print(json.dumps(results, indent=2))
+
+    if (args.save):
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if (args.compare):
+        with open(args.compare, "r") as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        if (regressions):
+            print(f"{len(regressions)} metric(s) got worse than {args.compare}:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            return 1
+        print(f"No regression against {args.compare}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
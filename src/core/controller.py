@@ -1,7 +1,9 @@
 from __future__ import annotations
+import queue
 import threading
 from core.word_box_solver_algo import WordBoxSolver
 from core.word_box_solver_img_processing import ImgProcessing
+from core.word_box_solver_registry import DictionaryRegistry, default_registry
 from random import uniform
 import time
 import pyautogui
@@ -17,7 +19,14 @@ class AppController:
         """
         self.app = app
         self.img_process : ImgProcessing = ImgProcessing(self.app)
-        self.solver : WordBoxSolver = WordBoxSolver()
+        self.dictionaries : DictionaryRegistry = default_registry()
+        self.solver : WordBoxSolver = WordBoxSolver(self.dictionaries.get("english"), cache_path="solutions.sqlite3")
+        
+        # Words found ahead of the automation, the search waits when it is full
+        self.word_queue_size : int = 32
+        
+        # Set to abort the running solve, see `cancel_solve`
+        self.stop_solving : threading.Event = threading.Event()
         
         
     def set_game(self) -> None :
@@ -87,16 +96,62 @@ class AppController:
         threading.Thread(target=task).start()
         
 
-    def automate(self):
-        """ Automation method for the mouse drags """
+    def set_dictionary(self, name : str) -> None:
+        """
+        Solves the next grids with another registered dictionary, loading it if needed
+
+        Raises:
+            RuntimeError: If the solver is running
+        """
+        self.solver.set_trie(self.dictionaries.get(name))
+        
+
+    def stream_solutions(self, words : queue.Queue, stop : threading.Event) -> None:
+        """
+        Background task feeding the words of the solver to the automation as they are found.
+        A None marks the end of the words.
+
+        Args:
+            words: Bounded queue read by `automate`
+            stop: Set by the automation when it no longer reads the queue, also cancels the search
+        """
+        stream = self.solver.solve_stream(cancel=stop)
+        try:
+            for item in stream:
+                while not stop.is_set():
+                    try:
+                        words.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        pass
+                if stop.is_set():
+                    return
+        finally:
+            # Let the solver forget the partial words before the next solve
+            stream.close()
+            while not stop.is_set():
+                try:
+                    words.put(None, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+
+    def automate(self, words : queue.Queue, stop : threading.Event):
+        """
+        Automation method for the mouse drags
+        
+        Args:
+            words: Queue of the ((word, word id), path) found by the solver, ended by None
+            stop: Tells the solver the automation is over
+        """
         setting_content = self.app.setting_content
         
         def on_press(key):
             """ Changes the state of the solving process based off the key pressed"""
             try:
-                # Stop the solving process entirely 
+                # Stop the solving process entirely, the search is aborted as well
                 if key == keyboard.Key.esc:
-                    self.app.is_solving = False
+                    self.cancel_solve()
                     return False
                 
                 # Pauses the solving process on the last word found
@@ -115,14 +170,22 @@ class AppController:
         
         self.app.is_solving = True # State of the solving process
         
-        # Sort the longest words from begining to the end
-        sorted_items = sorted(self.solver.found_words.items(), key=lambda x: len(x[0][0]), reverse=True)
-        
-        for (_, _), path in sorted_items:
+        # The solver streams the longest words first
+        while True:
             if not self.app.is_solving:
                 self.app.is_paused = False
                 break
             
+            try:
+                item = words.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            
+            if item is None:
+                break
+            
+            (_, _), path = item
+            
             y, x = path[0][0], path[0][1]
             position : tuple[int, int] = self.solver.cell_window_positions[y][x]
             
@@ -154,10 +217,21 @@ class AppController:
                 time.sleep(0.1)
         
         # Reinitiate solving state after automation
+        stop.set()
+        listener.stop()
         self.app.is_solving = False
         self.app.is_paused = False
 
 
+    def cancel_solve(self) -> None:
+        """
+        Aborts the running solve and its automation right away.
+        The words found so far stay in `solver.found_words`.
+        """
+        self.stop_solving.set()
+        self.app.is_solving = False
+
+
     def solve_game(self) -> None:
         """    
         Initiates the word-solving process by extracting letters, finding solutions,
@@ -183,9 +257,10 @@ class AppController:
             if (not grid.is_valid()) :
                 return
             
-            self.solver.set_letter_grid(letter_grid=letter_grid)
+            # Letters fixed by the user are remembered for the next scans
+            self.img_process.learn_corrections(letter_grid)
             
-            self.solver.solve() # Gets all the possible words from the grid 
+            self.solver.set_letter_grid(letter_grid=letter_grid)
             
             hwnd = self.app.screenshot_window_available()
             
@@ -205,7 +280,12 @@ class AppController:
             # Disable the scan window button also
             setting_content.disable_scan_window_btn()
             
-            self.automate() # Start the automation
+            # Search the grid in the background, the automation starts dragging with the first words found
+            words : queue.Queue = queue.Queue(maxsize=self.word_queue_size)
+            stop = self.stop_solving = threading.Event()
+            threading.Thread(target=self.stream_solutions, args=(words, stop), daemon=True).start()
+            
+            self.automate(words, stop) # Start the automation
             
             self.app.after(0, after_solving()) # call the function after the auotmation has ended
 
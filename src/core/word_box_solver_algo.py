@@ -1,79 +1,629 @@
-import copy
-from typing import List
+from __future__ import annotations
+from array import array
+from collections import Counter, deque
+from concurrent.futures import CancelledError, ProcessPoolExecutor, wait
+from functools import lru_cache
+import heapq
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Sequence
 import ctypes
+import multiprocessing
+import re
+import threading
+import time
 
 import json
 
+from core.word_box_solver_cache import SolutionCache
+from core.word_box_solver_paths import GridPath
+from core.word_box_solver_stats import SolveStats
+from core.word_box_solver_dictionary import (
+    DICTIONARY_VERSION, CompiledDictionary, default_artifact_path, open_dictionary, source_checksum, write_dictionary
+)
+
 # Holds all the possible words that can be used
-with open('wordList.json', 'r') as file:
-    wordList = json.load(file)
+WORD_LIST_PATH : str = "wordList.json"
+
+
+def load_word_list(path : str | Path = WORD_LIST_PATH) -> List[str]:
+    """ Parses the json list of words """
+    with open(path, 'r') as file:
+        return json.load(file)
 
-class TrieNode:
-    def __init__(self) :
+
+class LetterIndex:
+    def __init__(self, all_words : bytes, levels : List[List[bytes]]) -> None:
         """
-        Set's up a Trie node with 26 children, end-of-word flag, 
-        count, and optional index for word tracking.
+        Letter histogram index over the words of a Trie, used to find the words
+        a grid could possibly hold before searching it.
+
+        Every set of words is a bitset over the word ids (bit i of byte i // 8).
+
+        Args:
+            all_words: The words present in the trie
+            levels: levels[letter][k] holds the words with more than k copies of the letter
+        """
+        self.all_words : bytes = all_words
+        self.levels : List[List[bytes]] = levels
+        self._all_bitset : int = int.from_bytes(all_words, "little")
+        self._bitsets : dict[tuple[int, int], int] = {} # bitsets already converted to int
+    
+    @classmethod
+    def build(cls, words : Sequence[str], ids : Iterable[int]) -> LetterIndex:
+        """
+        Builds the index of the given word ids
+
+        Args:
+            words: The word list the ids refer to
+            ids: Ids of lowercase ascii words
+        """
+        size : int = (len(words) + 7) // 8
+        all_words = bytearray(size)
+        levels : List[List[bytearray]] = [[] for _ in range(26)]
+        
+        for i in ids:
+            byte, bit = i >> 3, 1 << (i & 7)
+            all_words[byte] |= bit
+            for c, n in Counter(words[i]).items():
+                level = levels[ord(c) - ord("a")]
+                while len(level) < n:
+                    level.append(bytearray(size))
+                for k in range(n):
+                    level[k][byte] |= bit
+        
+        return cls(bytes(all_words), [[bytes(b) for b in level] for level in levels])
+    
+    def _bitset(self, letter : int, level : int) -> int:
+        key = (letter, level)
+        bitset = self._bitsets.get(key)
+        if (bitset is None):
+            bitset = self._bitsets[key] = int.from_bytes(self.levels[letter][level], "little")
+        return bitset
+    
+    def candidates(self, letter_grid : List[List[str]]) -> List[int]:
         """
-        self.isEnd: bool = False
-        self.children: list = [None] * 26 # faster than using a hashmap
-        self.count: int = 0
-        self.index:int = -1
+        Selects the words which only use letters of the grid, each at most
+        as many times as it appears on the grid.
 
+        Args:
+            letter_grid: 2D list of characters representing the game board
+
+        Returns:
+            List[int]: Ids of the feasible words
+        """
+        histogram : List[int] = [0] * 26
+        for row in letter_grid:
+            for char in row:
+                for c in char:
+                    histogram[ord(c) - ord("a")] += 1
         
+        infeasible : int = 0
+        for letter in range(26):
+            if (histogram[letter] < len(self.levels[letter])):
+                infeasible |= self._bitset(letter, histogram[letter])
+        feasible : int = self._all_bitset & ~infeasible
+        
+        ids : List[int] = []
+        data : bytes = feasible.to_bytes(len(self.all_words), "little")
+        for match in re.finditer(rb"[^\x00]", data):
+            byte : int = match.start()
+            bits : int = data[byte]
+            while bits:
+                low : int = bits & -bits
+                ids.append(byte * 8 + low.bit_length() - 1)
+                bits ^= low
+        return ids
+
+
 class Trie:
-    def __init__ (self) -> None :
+    def __init__ (self, words : Sequence[str] = ()) -> None :
         """
-        Initializes the Trie with a root node and stores the list of words.
+        Initializes an empty compiled Trie over the list of words.
+
+        Nodes are plain integer ids (the root is 0) and every per-node field lives
+        in a flat typed array instead of a Python object:
+            child_masks : 26-bit mask of the letters that have a child node
+            first_child : id of the first child, siblings are stored contiguously
+            word_ids    : index into `words` if a word ends here, otherwise -1
+            counts      : number of words that pass through the node
+            subtree_masks : 26-bit mask of every letter below the node
+            depths      : maximum number of letters below the node (0 for a leaf)
+
+        A full dictionary also carries a `letter_index` to build per grid sub-tries,
+        and the `checksum` of the word list it was built from.
         """
-        self.root : TrieNode = TrieNode()
-        self.words : List[str] = wordList
+        self.root : int = 0
+        self.words : Sequence[str] = words
+        
+        self.child_masks : Sequence[int] = array("I")
+        self.first_child : Sequence[int] = array("I")
+        self.word_ids : Sequence[int] = array("i")
+        self.counts : Sequence[int] = array("I")
+        self.subtree_masks : Sequence[int] = array("I")
+        self.depths : Sequence[int] = array("H")
         
-    def insert(self, word, wordId) -> None:
+        self.letter_index : LetterIndex | None = None
+        self.dictionary : CompiledDictionary | None = None
+        self.checksum : bytes = b""
+    
+    @classmethod
+    def compile(cls, source_path : str | Path = WORD_LIST_PATH, artifact_path : str | Path | None = None) -> Trie:
+        """
+        Builds the Trie from a json word list and saves it as a compiled dictionary.
+
+        Args:
+            source_path: The json list of words
+            artifact_path: Where to write the compiled dictionary, next to the source by default
+
+        Returns:
+            Trie: The freshly built in-memory trie
         """
-        Inserts a word into the Trie, updating node counts
-        and marking the end of the word.
+        artifact_path = artifact_path or default_artifact_path(source_path)
+        
+        trie = cls(load_word_list(source_path))
+        trie.createTrie()
+        trie.checksum = source_checksum(source_path)
+        write_dictionary(artifact_path, trie, trie.checksum)
+        return trie
     
+    @classmethod
+    def load(cls, source_path : str | Path = WORD_LIST_PATH, artifact_path : str | Path | None = None) -> Trie:
+        """
+        Memory maps the compiled dictionary of a word list, compiling it
+        first if it is missing or was built from a different word list.
+
         Args:
-            word (str): The word to insert.
-            wordId (int): The index or ID associated with the word.
+            source_path: The json list of words
+            artifact_path: The compiled dictionary, next to the source by default
+
+        Returns:
+            Trie: A trie searching the mapped dictionary
         """
-        node : TrieNode = self.root
-        for c in word:
-            index = ord(c) - ord("a")
-            if (not node.children[index]):
-                node.children[index] = TrieNode()
-            node = node.children[index]
-            node.count += 1
-        node.isEnd = True
-        node.index = wordId
+        artifact_path = artifact_path or default_artifact_path(source_path)
+        checksum : bytes = source_checksum(source_path)
+        
+        compiled = open_dictionary(artifact_path, checksum)
+        if (compiled is None):
+            cls.compile(source_path, artifact_path)
+            compiled = open_dictionary(artifact_path, checksum)
+            if (compiled is None):
+                raise RuntimeError(f"Failed to compile the dictionary {artifact_path}")
         
-    def createTrie(self) -> None:
+        return cls.from_dictionary(compiled)
+    
+    @classmethod
+    def from_dictionary(cls, compiled : CompiledDictionary) -> Trie:
         """
-        Creates the Trie structure based off all the existing words
+        Wraps a mapped dictionary without copying the transitions or the words.
+        The trie is never mutated by a search, so it can be shared between threads.
+        """
+        trie = cls(compiled.words)
+        trie.dictionary = compiled
+        trie.checksum = compiled.checksum
+        trie.child_masks = compiled.child_masks
+        trie.first_child = compiled.first_child
+        trie.word_ids = compiled.word_ids
+        trie.counts = compiled.counts
+        trie.subtree_masks = compiled.subtree_masks
+        trie.depths = compiled.depths
+        trie.letter_index = LetterIndex(compiled.all_words, compiled.letter_levels)
+        return trie
+    
+    def child(self, node : int, index : int) -> int:
+        """
+        Follows the transition of a letter out of a node.
+
+        The children of a node are contiguous and ordered by letter, so the
+        offset of a child is the number of set bits below its letter in the mask.
+
+        Args:
+            node (int): The id of the current node.
+            index (int): The letter index (0 for "a" to 25 for "z").
+
+        Returns:
+            int: The id of the child node or -1 if there is no such transition.
+        """
+        mask : int = self.child_masks[node]
+        bit : int = 1 << index
+        if (not mask & bit):
+            return -1
+        return self.first_child[node] + (mask & (bit - 1)).bit_count()
+        
+    def createTrie(self, candidates : Iterable[int] | None = None) -> None:
+        """
+        Compiles the Trie structure based off all the existing words
         with a length greater than 3
+
+        The words are sorted once, then nodes are laid out breadth first so that
+        the children of every node are given consecutive ids. Each node only
+        covers a contiguous range of the sorted words which share its prefix.
+        Every node is then annotated with the letters and the maximum depth of its
+        subtree.
+
+        The full dictionary keeps only the words it compiled, in sorted order, so
+        a word id is also its rank in the compiled string table. The letter index
+        is only built for the full dictionary. A partial compile keeps the ids of
+        the dictionary it was cut from.
+
+        Args:
+            candidates: Only compile these word ids, every word by default
         """
-        for i in range(len(self.words)):
-            w : str = self.words[i]
-            if (len(w) > 3):
-                self.insert(w, i)
+        words : Sequence[str] = self.words
+        texts : dict[int, str] = {i: words[i] for i in (range(len(words)) if candidates is None else candidates)} # decoded once
+        ids : List[int] = sorted(
+            (i for i, w in texts.items() if len(w) > 3 and w.isascii() and w.isalpha() and w.islower()),
+            key=texts.__getitem__
+        )
+        
+        # Drop duplicated words, the last occurrence keeps its index
+        unique : List[int] = []
+        for i in ids:
+            if (unique and texts[unique[-1]] == texts[i]):
+                unique[-1] = i
+            else:
+                unique.append(i)
+        ids = unique
+        sorted_words : List[str] = [texts[i] for i in ids]
+        if (candidates is None):
+            self.words = words = sorted_words
+            ids = list(range(len(sorted_words)))
+        
+        child_masks : array = array("I", [0])
+        first_child : array = array("I", [0])
+        word_ids : array = array("i", [-1])
+        counts : array = array("I", [0])
+        parents : array = array("I", [0])
+        letters : array = array("B", [0])
+        
+        # (node, lo, hi, depth) : sorted_words[lo:hi] share the prefix of the node
+        queue : deque = deque([(0, 0, len(sorted_words), 0)])
+        while queue:
+            node, lo, hi, depth = queue.popleft()
+            
+            # The shortest word of the range comes first once sorted
+            if (lo < hi and len(sorted_words[lo]) == depth):
+                word_ids[node] = ids[lo]
+                lo += 1
+            
+            first_child[node] = len(child_masks)
+            mask : int = 0
+            i : int = lo
+            while i < hi:
+                c : str = sorted_words[i][depth]
+                j : int = i + 1
+                while j < hi and sorted_words[j][depth] == c:
+                    j += 1
+                
+                mask |= 1 << (ord(c) - ord("a"))
+                queue.append((len(child_masks), i, j, depth + 1))
                 
-    def rebuild(self, foundWords : List[tuple[str, int]]) -> None:
+                child_masks.append(0)
+                first_child.append(0)
+                word_ids.append(-1)
+                counts.append(j - i)
+                parents.append(node)
+                letters.append(ord(c) - ord("a"))
+                i = j
+            child_masks[node] = mask
+        
+        # Children always come after their parent, so a reverse pass sees a subtree before its root
+        subtree_masks : array = array("I", bytes(4 * len(child_masks)))
+        depths : array = array("H", bytes(2 * len(child_masks)))
+        for node in range(len(child_masks) - 1, 0, -1):
+            parent : int = parents[node]
+            subtree_masks[parent] |= (1 << letters[node]) | subtree_masks[node]
+            if (depths[node] >= depths[parent]):
+                depths[parent] = depths[node] + 1
+        
+        self.child_masks = child_masks
+        self.first_child = first_child
+        self.word_ids = word_ids
+        self.counts = counts
+        self.subtree_masks = subtree_masks
+        self.depths = depths
+        
+        if (candidates is None):
+            self.letter_index = LetterIndex.build(words, ids)
+    
+    def subtrie(self, letter_grid : List[List[str]]) -> Trie:
         """
-        Adds back the pruned words to the trie
+        Compiles a small trie holding only the words the grid could contain,
+        based on the letters of the grid and how many times each appears.
+        Word ids are kept, so results match a search of the full trie.
 
         Args:
-            foundWords (list): All the words that were found in the grid
+            letter_grid: 2D list of characters representing the game board
         """
-        for w, wId in foundWords:
-            if (len(w) > 3):
-                self.insert(w, wId)
-            
+        if (self.letter_index is None):
+            raise RuntimeError("The trie has no letter index")
+        
+        trie = Trie(self.words)
+        trie.createTrie(self.letter_index.candidates(letter_grid))
+        return trie
+
+
+class TileTransitions:
+    def __init__(self, trie : Trie, letter_grid : List[List[str]]) -> None:
+        """
+        Transitions of the tiles of a grid through a Trie, resolved once per grid.
+
+        Every cell gets a tile code : the letter index of a single letter tile,
+        or 26 + k for the k-th distinct multi-letter tile of the grid ("qu", "th"...).
+        A multi-letter tile walks its letters the first time it is taken from a node,
+        then the node it leads to is remembered, so entering a cell costs a single
+        lookup whatever the length of its tile.
+
+        Args:
+            trie: The trie searched
+            letter_grid: 2D list of characters representing the game board
+        """
+        self.trie : Trie = trie
+        self.child_masks = trie.child_masks
+        self.first_child = trie.first_child
+        self.chars : List[str] = [char for row in letter_grid for char in row] # tile of every cell (row * colSize + col)
+        self.codes : List[int] = [] # tile code of every cell
+        self.first_bits : List[int] = [] # first letter of every cell as a 26-bit mask
+        self.tiles : List[tuple[int, ...]] = [] # letter indexes of the multi-letter tiles
+        
+        multi : dict[str, int] = {}
+        for row in letter_grid:
+            for char in row:
+                self.first_bits.append(1 << (ord(char[0]) - ord("a")))
+                if (len(char) == 1):
+                    self.codes.append(ord(char) - ord("a"))
+                    continue
+                if (char not in multi):
+                    multi[char] = 26 + len(self.tiles)
+                    self.tiles.append(tuple(ord(c) - ord("a") for c in char))
+                self.codes.append(multi[char])
+        
+        self.stride : int = 26 + len(self.tiles)
+        self.resolved : dict[int, int] = {} # node * stride + code : node reached by a multi-letter tile
+    
+    def child(self, node : int, code : int) -> int:
+        """
+        Follows a tile out of a node.
+
+        Args:
+            node (int): The id of the current node.
+            code (int): The tile code of a cell.
+
+        Returns:
+            int: The id of the node reached, or -1 if the trie has no such path.
+        """
+        if (code < 26):
+            # Same lookup as `Trie.child`, inlined since it runs for every cell entered
+            mask : int = self.child_masks[node]
+            bit : int = 1 << code
+            if (not mask & bit):
+                return -1
+            return self.first_child[node] + (mask & (bit - 1)).bit_count()
+        
+        key : int = node * self.stride + code
+        nextNode : int | None = self.resolved.get(key)
+        if (nextNode is None):
+            nextNode = node
+            for index in self.tiles[code - 26]:
+                nextNode = self.trie.child(nextNode, index)
+                if (nextNode < 0):
+                    break
+            self.resolved[key] = nextNode
+        return nextNode
+
+
+class SearchCancelled(Exception):
+    """ Raised inside a search once its cancel token is set or its deadline has passed """
+
+
+# Number of trie transitions between two checks of the cancel token and the deadline
+CANCEL_CHECK_INTERVAL : int = 1024
+
+
+def is_cancelled(cancel : threading.Event | None, deadline : float | None) -> bool:
+    """ The token was set or the `time.perf_counter()` deadline has passed """
+    return ((cancel is not None and cancel.is_set()) or
+            (deadline is not None and time.perf_counter() >= deadline))
+
+
+class SolveState:
+    def __init__(self, cancel : threading.Event | None = None, deadline : float | None = None) -> None:
+        """
+        Search state private to a single solve, which keeps the shared Trie immutable.
+
+        Attributes:
+            found_words: Found (word, word id) pairs and the path of each one
+            found_ids: Ids of the found words, to avoid duplicates
+            pruned: Number of found words below a node, the node is exhausted
+                once it reaches the count of words passing through it
+            letter_counts: Number of unvisited cells holding each letter
+            available: 26-bit mask of the letters of the unvisited cells
+            expansions: Neighbor cells tried by the search
+            saved_expansions: Neighbor cells skipped thanks to the subtree masks and depths
+            transitions: Trie transitions followed from a tile
+            exhausted: Branches cut because every word below the node was already found
+            duplicates: Word nodes reached again after their word was found
+            start_times: Seconds spent on each start cell, only measured when not None
+            cancel: Set from another thread to stop the search, see `check_cancel`
+            deadline: `time.perf_counter()` time at which the search stops
+            cancelled: The search was stopped early, the found words are partial
+            tiles: Tile transitions of the grid searched by `dfs`
+        """
+        self.found_words : dict[tuple[str, int], GridPath] = {}
+        self.found_ids : set[int] = set()
+        self.pruned : dict[int, int] = {}
+        
+        self.letter_counts : List[int] = [0] * 26
+        self.available : int = 0
+        
+        self.expansions : int = 0
+        self.saved_expansions : int = 0
+        self.transitions : int = 0
+        self.exhausted : int = 0
+        self.duplicates : int = 0
+        self.start_times : dict[int, float] | None = None
+        
+        self.cancel : threading.Event | None = cancel
+        self.deadline : float | None = deadline
+        self.cancelled : bool = False
         
+        self.tiles : TileTransitions | None = None
+    
+    def count_letters(self, letter_grid : List[List[str]]) -> None:
+        """ Marks every cell of the grid as unvisited """
+        self.letter_counts = [0] * 26
+        self.available = 0
+        for row in letter_grid:
+            for char in row:
+                self.give(char)
+    
+    def take(self, char : str) -> None:
+        """ Removes the letters of a visited cell from the available letters """
+        for c in char:
+            index : int = ord(c) - ord("a")
+            self.letter_counts[index] -= 1
+            if (self.letter_counts[index] == 0):
+                self.available &= ~(1 << index)
+    
+    def give(self, char : str) -> None:
+        """ Puts back the letters of a cell once it is backtracked """
+        for c in char:
+            index : int = ord(c) - ord("a")
+            self.letter_counts[index] += 1
+            self.available |= 1 << index
+    
+    def can_continue(self, trie : Trie, node : int) -> bool:
+        """
+        A word can only continue below the node if the node has children and
+        one of the letters of its subtree is still on an unvisited cell.
+        """
+        return trie.depths[node] > 0 and (trie.subtree_masks[node] & self.available) != 0
+        
+    def check_cancel(self) -> None:
+        """
+        Stops the search if it was cancelled or ran past its deadline.
+        The engines call it every CANCEL_CHECK_INTERVAL transitions.
+
+        Raises:
+            SearchCancelled: If the search must stop
+        """
+        if (is_cancelled(self.cancel, self.deadline)):
+            self.cancelled = True
+            raise SearchCancelled()
+    
+    def is_exhausted(self, trie : Trie, node : int) -> bool:
+        """ Every word passing through the node has already been found """
+        return self.pruned.get(node, 0) == trie.counts[node]
+    
+    def add_word(self, trie : Trie, wordId : int, path : GridPath, word : str | None = None) -> None:
+        """
+        Records a found word and prunes its prefixes, the path is stored as is.
+        The search passes the word spelled by the path, so it isn't decoded from the trie.
+        """
+        wordFound : str = word if word is not None else trie.words[wordId]
+        self.found_words[(wordFound, wordId)] = path
+        self.found_ids.add(wordId)
+        
+        prune : int = trie.root
+        for c in wordFound :
+            prune = trie.child(prune, ord(c) - ord("a"))
+            self.pruned[prune] = self.pruned.get(prune, 0) + 1
+
+
+# Minimum word lengths of the successive passes of a streamed solve, longest words come first
+LENGTH_TIERS : tuple[int, ...] = (7, 4)
+
+def length_points(length : int) -> float:
+    """ Default score of a word, longer words are worth much more, under 4 letters there is no word """
+    if (length < 4):
+        return 0
+    return (1, 2, 3, 5)[length - 4] if length < 8 else 11 + 3 * (length - 8)
+
+
+# Same order as the recursive search : top, bottom, left, right, top-left, top-right, bottom-left, bottom-right
+DIRECTIONS : tuple[tuple[int, int], ...] = ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1))
+
+
+@lru_cache(maxsize=None)
+def neighbor_table(rowSize : int, colSize : int) -> tuple[tuple[int, ...], ...]:
+    """
+    Lists the in-bounds neighbors of every cell of a grid size, computed once per size.
+    Cells are numbered row by row (row * colSize + col).
+    """
+    return tuple(
+        tuple((row + dr) * colSize + (col + dc) for dr, dc in DIRECTIONS
+              if 0 <= row + dr < rowSize and 0 <= col + dc < colSize)
+        for row in range(rowSize) for col in range(colSize)
+    )
+
+
+# Solver of a worker process, attached to the mapped dictionary once per process,
+# and the event set by the parent process to cancel the running tasks
+_worker_solver : WordBoxSolver | None = None
+_worker_cancel = None
+
+# Grid last searched by the "vector" engine in a worker process and the solver of its survivors
+_worker_survivors : tuple[tuple, WordBoxSolver] | None = None
+
+# Seconds between two checks of the cancel token while waiting for a worker
+PARALLEL_POLL_INTERVAL : float = 0.05
+
+
+def _init_worker(dictionary_path : str, cancel) -> None:
+    """ Maps the compiled dictionary in a worker process, no checksum nor rebuild involved """
+    global _worker_solver, _worker_cancel
+    _worker_solver = WordBoxSolver(Trie.from_dictionary(CompiledDictionary(dictionary_path)))
+    _worker_cancel = cancel
+
+
+def _search_start_cell(letter_grid : List[List[str]], engine : str, start : int, wall_deadline : float | None = None,
+                       survivors : List[int] | None = None) -> tuple[dict[tuple[str, int], GridPath], bool]:
+    """
+    Worker task : finds the words starting from a single cell
+
+    Args:
+        wall_deadline: `time.time()` time at which the search stops, the
+            `time.perf_counter()` clock isn't shared between processes
+        survivors: Word ids verified once by the parent for the "vector" engine
+
+    Returns:
+        The found words and whether the search was stopped early
+    """
+    deadline : float | None = None if wall_deadline is None else time.perf_counter() + wall_deadline - time.time()
+    state = SolveState(_worker_cancel, deadline)
+    if (is_cancelled(state.cancel, state.deadline)):
+        return {}, True
+    if (survivors is None):
+        _worker_solver.search(letter_grid, engine, state, [start])
+        return state.found_words, state.cancelled
+    
+    # The sub-trie of the survivors is compiled once per grid, not once per start cell
+    global _worker_survivors
+    key : tuple = tuple(map(tuple, letter_grid))
+    if (_worker_survivors is None or _worker_survivors[0] != key):
+        trie = Trie(_worker_solver.trie.words)
+        trie.createTrie(survivors)
+        _worker_survivors = (key, WordBoxSolver(trie))
+    _worker_survivors[1].search(letter_grid, "iterative", state, [start])
+    return state.found_words, state.cancelled
+
+
+def cache_namespace(trie : Trie) -> str:
+    """ Cached word ids depend on how the dictionary numbers its words as well as on the word list """
+    return f"{DICTIONARY_VERSION}:{trie.checksum.hex()}"
+
+
 class WordBoxSolver:
-    def __init__ (self):
-        self.trie = Trie()
-        self.trie.createTrie() # Create the dictionary tree
-        self.found_words : dict[tuple[str, int], list[list[int]]] = {}
+    def __init__ (self, trie : Trie | None = None, cache_path : str | Path | None = None):
+        """
+        Args:
+            trie: A dictionary shared with other solvers, the compiled word list is mapped by default
+            cache_path: sqlite file persisting the solved grids, solutions are only kept in memory by default
+        """
+        self.trie = trie if trie is not None else Trie.load() # Map the compiled dictionary tree
+        
+        # Solutions depend on the dictionary they were found with
+        self.cache = SolutionCache(path=cache_path, namespace=cache_namespace(self.trie))
+        self.found_words : dict[tuple[str, int], GridPath] = {}
         
         self.window_left : int
         self.window_top : int
@@ -81,17 +631,30 @@ class WordBoxSolver:
         self.letter_grid : List[List[str]] = []
         self.cell_window_positions : List[List[tuple[int, int]]] = []
         
-        self.is_solving = False
+        self.is_solving = False # A solve or a solve stream is running, set under the lock
+        self.lock = threading.Lock()
         self.paused = False
         
         self.speed = 0.8
+        
+        self.pool : ProcessPoolExecutor | None = None
+        self.pool_workers : int = 0
+        self.pool_cancel = None # multiprocessing event cancelling the tasks of the pool
+        
+        self.vector = None # VectorVerifier of the "vector" engine, built on first use
+        self.stats : SolveStats | None = None # Stats of the last solve, when collected
+        self.cancelled : bool = False # The last solve was stopped early, `found_words` is partial
+        
+        # Last solved grid and, for every cell, the found words whose path goes through it
+        self.solved_grid : List[List[str]] = []
+        self.cell_words : List[set[tuple[str, int]]] = []
 
         
     def is_valid(self, row : int, col : int, rowSize : int, colSize : int ) -> bool: 
         """ Grid boundary validation """
         return (row >= 0 and row < rowSize and col >= 0 and col < colSize)
     
-    def dfs(self, grid: List[List[str]], node: TrieNode,  path : List[List[int]], row : int, col : int):
+    def dfs(self, grid: List[List[str]], node: int,  path : List[int], row : int, col : int, state : SolveState):
         """
         Performs depth-first search to find valid words in the letter grid using a trie.
         
@@ -100,79 +663,794 @@ class WordBoxSolver:
         
         Args:
             grid: 2D list of characters representing the game board
-            node: Current node in the trie during traversal
-            path: List of coordinates for the current word being formed
+            node: Id of the current node in the trie during traversal
+            path: Cells (row * colSize + col) of the current word being formed
             row: Current row position in the grid
             col: Current column position in the grid
+            state: Found words and pruning of the current solve, with the tile transitions of the grid
         """
 
         if (not self.is_valid(row, col, len(grid), len(grid[0])) or grid[row][col] == ".") :
             return
         
+        trie : Trie = self.trie
         char : str = grid[row][col]
-        index : int = ord(char[0]) - ord("a")
-        
-        
-        if (not node or not node.children[index] or node.children[index].count == 0): return
+        cell : int = row * len(grid[0]) + col
         
-        # Move to the next node in the trie
-        node = node.children[index]
+        # Move to the next node in the trie, a multi-letter tile is a single transition
+        node = state.tiles.child(node, state.tiles.codes[cell])
+        if (node < 0): return
+        state.transitions += 1
+        if (not state.transitions % CANCEL_CHECK_INTERVAL):
+            state.check_cancel()
+        if (state.is_exhausted(trie, node)):
+            state.exhausted += 1
+            return
 
         # Mark as visited
         grid[row][col] = "."
+        path.append(cell)
+
+        # Check if a word has been found
+        wordId : int = trie.word_ids[node]
+        if(wordId >= 0):
+            if (wordId in state.found_ids):
+                state.duplicates += 1
+            else:
+                state.add_word(trie, wordId, GridPath.from_cells(path, len(grid[0])), "".join(state.tiles.chars[c] for c in path))
         
-        # Handles multi character inputs
-        if (len(char) > 1) :
-            if (node):
-                node = node.children[ord(char[1]) - ord("a")]
-        
-        if (not node or node.count < 0):
+        # Cut the branch when no remaining letter can extend a word
+        if (trie.depths[node] == 0):
+            node = -1
+        else:
+            state.take(char)
+            if (not state.can_continue(trie, node)):
+                state.give(char)
+                node = -1
+        if (node < 0):
+            state.saved_expansions += len(DIRECTIONS)
             grid[row][col] = char
+            path.pop()
             return
-        
-        path.append([row, col])
-
-        # Check if a word has been found
-        if(node.isEnd):
-            wordFound = self.trie.words[node.index]
-            key = (wordFound, node.index)
-            self.found_words[key] = copy.deepcopy(path)
-            node.isEnd = False # mark as False to avoid duplicates
-            
-            # Pruning
-            prune : Trie = self.trie.root
-            for c in wordFound :
-                prune = prune.children[ord(c) - ord("a")]
-                prune.count -= 1
+        state.expansions += len(DIRECTIONS)
         
 
         # Top, Bottom
-        self.dfs(grid, node,  path,  row-1, col)
-        self.dfs(grid, node,  path,  row+1, col)
+        self.dfs(grid, node,  path,  row-1, col, state)
+        self.dfs(grid, node,  path,  row+1, col, state)
 
         # Left, Right
-        self.dfs(grid, node,  path,  row, col-1)
-        self.dfs(grid, node,  path,  row, col+1)
+        self.dfs(grid, node,  path,  row, col-1, state)
+        self.dfs(grid, node,  path,  row, col+1, state)
         
         # Top-left, Top, Top-right
-        self.dfs(grid, node, path,  row-1, col-1)
-        self.dfs(grid, node,  path,  row-1, col+1)
+        self.dfs(grid, node, path,  row-1, col-1, state)
+        self.dfs(grid, node,  path,  row-1, col+1, state)
 
         # Bottom-left, Bottom-right
-        self.dfs(grid, node,  path,  row+1, col-1)
-        self.dfs(grid, node,  path,  row+1, col+1)
+        self.dfs(grid, node,  path,  row+1, col-1, state)
+        self.dfs(grid, node,  path,  row+1, col+1, state)
         
         # Backtrack
+        state.give(char)
         grid[row][col] = char
         path.pop()
         
-    def solve(self) :
-        self.found_words = {} # To remove the previous results
-        for row in range(len(self.letter_grid)):
-            for col in range(len(self.letter_grid[0])):
-                self.dfs(self.letter_grid, self.trie.root, [], row, col)
+    def iterative_search(self, letter_grid : List[List[str]], state : SolveState, starts : Iterable[int] | None = None,
+                         required : int = 0, min_length : int = 0) -> None:
+        """
+        Explicit stack version of `dfs` which never recurses nor writes to the grid.
+
+        Visited cells are tracked in a bitmask and neighbors come from the cached
+        `neighbor_table`, so no out of bounds cell is ever tried. When a cell is
+        entered, only the unvisited neighbors whose letter is a child of the
+        current node are kept. Neighbors are explored in the same order as `dfs`,
+        which finds the same words and paths.
+
+        Args:
+            letter_grid: 2D list of characters representing the game board
+            state: Found words and pruning of the current solve
+            starts: Cells (row * colSize + col) to start words from, every cell by default
+            required: Bitmask of cells, when set only words whose path goes through
+                one of them are recorded. Until the path reaches one of them, a branch
+                is cut when no letter of those cells is below its node or when the
+                closest of those cells is further away than the longest word below it
+            min_length: Only record words of at least this many letters, a branch is
+                cut once the longest word below its node is too short
+        """
+        trie : Trie = self.trie
+        colSize : int = len(letter_grid[0])
+        neighbors = neighbor_table(len(letter_grid), colSize)
+        chars : List[str] = [char for row in letter_grid for char in row]
+        tiles = TileTransitions(trie, letter_grid)
+        codes : List[int] = tiles.codes
+        first_bits : List[int] = tiles.first_bits
+        
+        # Number of steps from each cell to the closest required cell
+        targets : List[int] = [cell for cell in range(len(chars)) if required >> cell & 1]
+        required_letters : int = 0
+        for cell in targets:
+            required_letters |= first_bits[cell]
+        required_dist : List[int] = [
+            min((max(abs(cell // colSize - t // colSize), abs(cell % colSize - t % colSize)) for t in targets), default=0)
+            for cell in range(len(chars))
+        ]
+        
+        def advance(node : int, cell : int) -> int:
+            """ Follows the tile of a cell, returns -1 on a dead or exhausted branch """
+            node = tiles.child(node, codes[cell])
+            if (node < 0):
+                return -1
+            state.transitions += 1
+            if (not state.transitions % CANCEL_CHECK_INTERVAL):
+                state.check_cancel()
+            if (state.is_exhausted(trie, node)):
+                state.exhausted += 1
+                return -1
+            return node
+        
+        def check_word(node : int, path : List[int], visited : int, length : int) -> None:
+            if ((required and not visited & required) or length < min_length):
+                return
+            wordId : int = trie.word_ids[node]
+            if (wordId < 0):
+                return
+            if (wordId in state.found_ids):
+                state.duplicates += 1
+            else:
+                state.add_word(trie, wordId, GridPath.from_cells(path, colSize), "".join(chars[c] for c in path))
+        
+        for start in (range(len(chars)) if starts is None else starts):
+            begin : float = time.perf_counter()
+            try:
+                node : int = advance(trie.root, start)
+                if (node < 0):
+                    continue
+            
+                path : List[int] = [start]
+                visited : int = 0
+                length : int = 0 # letters on the path
+            
+                # Each frame holds a cell, its trie node, the neighbors worth trying and the position of the next one
+                stack : List[list] = []
+                cell, nextNode = start, node
+                while True:
+                    # Enter the cell
+                    visited |= 1 << cell
+                    length += len(chars[cell])
+                    state.take(chars[cell])
+                    check_word(nextNode, path, visited, length)
+                
+                    if (state.can_continue(trie, nextNode) and length + trie.depths[nextNode] >= min_length and
+                        (not required or visited & required or
+                         (trie.subtree_masks[nextNode] & required_letters and required_dist[cell] <= trie.depths[nextNode]))):
+                        cont : int = trie.child_masks[nextNode]
+                        candidates : List[int] = [n for n in neighbors[cell] if not visited >> n & 1 and first_bits[n] & cont]
+                        state.expansions += len(candidates)
+                        state.saved_expansions += len(neighbors[cell]) - len(candidates)
+                        stack.append([cell, nextNode, candidates, 0])
+                    else:
+                        state.saved_expansions += len(neighbors[cell])
+                        path.pop()
+                        visited ^= 1 << cell
+                        length -= len(chars[cell])
+                        state.give(chars[cell])
+                
+                    # Find the next neighbor to enter, backtracking once a cell has none left
+                    cell = -1
+                    while stack:
+                        frame = stack[-1]
+                        frameCell, node, candidates, k = frame
+                        if (k == len(candidates)):
+                            stack.pop()
+                            path.pop()
+                            visited ^= 1 << frameCell
+                            length -= len(chars[frameCell])
+                            state.give(chars[frameCell])
+                            continue
+                    
+                        frame[3] = k + 1
+                        nextNode = advance(node, candidates[k])
+                        if (nextNode >= 0):
+                            cell = candidates[k]
+                            path.append(cell)
+                            break
+                
+                    if (cell < 0):
+                        break
+            finally:
+                if (state.start_times is not None):
+                    state.start_times[start] = time.perf_counter() - begin
+    
+    def vector_search(self, letter_grid : List[List[str]], state : SolveState, starts : Iterable[int] | None = None) -> None:
+        """
+        Verification engine : instead of walking the dictionary trie from every cell,
+        the words that fit the letters of the grid are checked all at once by
+        `VectorVerifier` (requires NumPy). Only the few survivors are compiled into a
+        sub-trie, searched exactly by `iterative_search`, so the words and paths
+        match the other engines.
+
+        Args:
+            letter_grid: 2D list of characters representing the game board
+            state: The search state, found words are skipped
+            starts: Cells (row * colSize + col) to start words from, every cell by default
+        """
+        trie = Trie(self.trie.words)
+        trie.createTrie(self.vector_survivors(letter_grid))
+        WordBoxSolver(trie).iterative_search(letter_grid, state, starts)
+    
+    def vector_survivors(self, letter_grid : List[List[str]]) -> List[int]:
+        """ Ids of the words the grid may spell, the verifier is built on first use and kept """
+        if (self.vector is None):
+            from core.word_box_solver_vector import VectorVerifier
+            self.vector = VectorVerifier(self.trie)
+        return self.vector.survivors(letter_grid)
+    
+    def search(self, letter_grid : List[List[str]], engine : str, state : SolveState, starts : Iterable[int] | None = None) -> None:
+        """
+        Runs a search engine over the grid, filling the state with the found words.
+        When the state measures `start_times`, the engines time each start cell as they go.
+        A cancelled search returns normally, with `state.cancelled` set and the words found so far.
+
+        Args:
+            letter_grid: 2D list of characters representing the game board
+            engine: "recursive" for `dfs`, "iterative" for `iterative_search` or "vector" for `vector_search`
+            state: A fresh state for the search
+            starts: Cells (row * colSize + col) to start words from, every cell by default
+        """
+        colSize : int = len(letter_grid[0])
+        if (starts is None):
+            starts = range(len(letter_grid) * colSize)
+        
+        state.count_letters(letter_grid)
+        try:
+            self.search_starts(letter_grid, engine, state, starts)
+        except SearchCancelled:
+            pass
+    
+    def search_starts(self, letter_grid : List[List[str]], engine : str, state : SolveState, starts : Iterable[int]) -> None:
+        """ Runs a search engine from the start cells, the letters of the state are already counted """
+        colSize : int = len(letter_grid[0])
+        if (engine == "iterative"):
+            self.iterative_search(letter_grid, state, starts)
+        elif (engine == "recursive"):
+            state.tiles = TileTransitions(self.trie, letter_grid)
+            grid : List[List[str]] = [row[:] for row in letter_grid] # visited cells are marked on a private copy
+            for start in starts:
+                begin : float = time.perf_counter()
+                try:
+                    self.dfs(grid, self.trie.root, [], start // colSize, start % colSize, state)
+                finally:
+                    if (state.start_times is not None):
+                        state.start_times[start] = time.perf_counter() - begin
+        elif (engine == "vector"):
+            self.vector_search(letter_grid, state, starts)
+        else:
+            raise ValueError(f"Unknown search engine: {engine}")
+    
+    def parallel_search(self, letter_grid : List[List[str]], engine : str, workers : int,
+                        cancel : threading.Event | None = None,
+                        deadline : float | None = None) -> tuple[dict[tuple[str, int], GridPath], bool]:
+        """
+        Searches every start cell in its own task on a pool of worker processes.
+
+        Workers map the same compiled dictionary file, so its pages are shared and
+        nothing is rebuilt. The pool is kept alive between solves. Results are
+        merged by increasing start cell, keeping the first path of each word,
+        which gives the same words, paths and order as a serial search. The "vector"
+        engine verifies the words of the grid once here, the workers only search the survivors.
+
+        Args:
+            letter_grid: 2D list of characters representing the game board
+            engine: The engine run by the workers
+            workers: Number of worker processes
+            cancel: Watched while waiting for the workers, once set the pending cells are
+                dropped and the running ones are stopped through an event shared with the pool
+            deadline: `time.perf_counter()` time checked by the workers as they search
+
+        Returns:
+            The path of each found (word, word id) pair and whether the search was
+            stopped early, the words of the searched cells are then partial
+        """
+        if (self.trie.dictionary is None):
+            raise RuntimeError("A parallel solve needs a trie mapped from a compiled dictionary")
+        
+        if (self.pool is None or self.pool_workers != workers):
+            self.close()
+            self.pool_cancel = multiprocessing.Event()
+            self.pool = ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker,
+                initargs=(str(self.trie.dictionary.path), self.pool_cancel)
+            )
+            self.pool_workers = workers
+        self.pool_cancel.clear()
+        
+        wall_deadline : float | None = None if deadline is None else time.time() + deadline - time.perf_counter()
+        survivors : List[int] | None = self.vector_survivors(letter_grid) if engine == "vector" else None
+        cells : range = range(len(letter_grid) * len(letter_grid[0]))
+        futures = [self.pool.submit(_search_start_cell, letter_grid, engine, cell, wall_deadline, survivors) for cell in cells]
+        
+        found_words : dict[tuple[str, int], GridPath] = {}
+        stopped : bool = False
+        for future in futures:
+            while (cancel is not None and not self.pool_cancel.is_set() and not future.done()):
+                wait([future], timeout=PARALLEL_POLL_INTERVAL)
+                if (cancel.is_set()):
+                    self.pool_cancel.set()
+                    for pending in futures:
+                        pending.cancel()
+            try:
+                words, cellStopped = future.result()
+            except CancelledError:
+                stopped = True
+                continue
+            stopped |= cellStopped
+            for key, path in words.items():
+                if (key not in found_words):
+                    found_words[key] = path
+        return found_words, stopped
+    
+    def start_solving(self) -> None:
+        """ Marks a solve as running until it sets `is_solving` back, see `set_trie` """
+        with self.lock:
+            self.is_solving = True
+    
+    def set_trie(self, trie : Trie) -> None:
+        """
+        Hot-swaps the dictionary, see `DictionaryRegistry` to hold several at once.
+        Everything derived from the previous dictionary is dropped : worker processes,
+        the vector verifier, the found words and the cached solutions in memory.
+
+        Raises:
+            RuntimeError: If a solve or a solve stream is running
+        """
+        with self.lock:
+            if (self.is_solving):
+                raise RuntimeError("The dictionary can't be swapped while solving")
+            
+            self.close()
+            self.trie = trie
+            self.vector = None
+            self.cache.set_namespace(cache_namespace(trie))
+            self.found_words = {}
+            self.solved_grid = []
+            self.cell_words = []
+    
+    def close(self) -> None:
+        """ Shuts down the worker processes of the parallel solve """
+        if (self.pool is not None):
+            self.pool.shutdown()
+            self.pool = None
+            self.pool_workers = 0
+    
+    def find_path(self, letter_grid : List[List[str]], word : str, starts : Iterable[int] | None = None) -> GridPath | None:
+        """
+        Looks for one path spelling a given word on the grid
+
+        Args:
+            letter_grid: 2D list of characters representing the game board
+            word: The word to spell
+            starts: Cells (row * colSize + col) the path may start from, every cell by default
+
+        Returns:
+            The first path found or None if the grid can't spell the word
+        """
+        colSize : int = len(letter_grid[0])
+        neighbors = neighbor_table(len(letter_grid), colSize)
+        chars : List[str] = [char for row in letter_grid for char in row]
+        
+        def extend(cell : int, pos : int, visited : int, path : List[int]) -> bool:
+            if (not word.startswith(chars[cell], pos)):
+                return False
+            path.append(cell)
+            pos += len(chars[cell])
+            if (pos == len(word)):
+                return True
+            for nextCell in neighbors[cell]:
+                if (not visited >> nextCell & 1 and extend(nextCell, pos, visited | 1 << nextCell, path)):
+                    return True
+            path.pop()
+            return False
+        
+        for start in (range(len(chars)) if starts is None else starts):
+            path : List[int] = []
+            if (extend(start, 0, 1 << start, path)):
+                return GridPath.from_cells(path, colSize)
+        return None
+    
+    def forget_paths(self) -> None:
+        """ The found words are partial, so the next solve mustn't update them incrementally """
+        self.solved_grid = []
+        self.cell_words = []
+    
+    def index_paths(self, letter_grid : List[List[str]]) -> None:
+        """ Remembers the solved grid and which found words go through each of its cells """
+        colSize : int = len(letter_grid[0])
+        self.solved_grid = [row[:] for row in letter_grid]
+        self.cell_words = [set() for _ in range(len(letter_grid) * colSize)]
+        for key, path in self.found_words.items():
+            for cell in path.cells:
+                self.cell_words[cell].add(key)
+    
+    def changed_cells(self, letter_grid : List[List[str]]) -> List[int] | None:
+        """
+        Compares a grid with the last solved grid
+
+        Returns:
+            The cells (row * colSize + col) holding a different letter, or None
+            if there is no previous solve of a grid of the same size
+        """
+        previous : List[List[str]] = self.solved_grid
+        if (not previous or len(previous) != len(letter_grid) or len(previous[0]) != len(letter_grid[0])):
+            return None
+        colSize : int = len(letter_grid[0])
+        return [row * colSize + col for row in range(len(letter_grid)) for col in range(colSize)
+                if previous[row][col] != letter_grid[row][col]]
+    
+    def incremental_search(self, letter_grid : List[List[str]], changed : List[int],
+                           state : SolveState | None = None) -> dict[tuple[str, int], GridPath]:
+        """
+        Updates the previous solution after a few cells of the grid were edited.
+
+        Words whose path avoids the edited cells are kept and seeded into the
+        search state, which prunes every branch they exhaust. The search then
+        only records paths through an edited cell. The dropped words are looked
+        for again one by one, in case another path avoiding the edits spells them.
+
+        Args:
+            letter_grid: The edited grid, the same size as the last solved grid
+            changed: The edited cells (row * colSize + col)
+            state: A fresh state to fill, pass one to read the search counters afterwards
+                or to cancel the search, the kept words are then returned with the new ones found so far
+
+        Returns:
+            dict: The path of each found (word, word id) pair
+        """
+        invalidated : set[tuple[str, int]] = set()
+        for cell in changed:
+            invalidated |= self.cell_words[cell]
+        
+        state = state if state is not None else SolveState()
+        for key, path in self.found_words.items():
+            if (key not in invalidated):
+                state.add_word(self.trie, key[1], path, key[0])
+        
+        state.count_letters(letter_grid)
+        try:
+            self.iterative_search(letter_grid, state, required=sum(1 << cell for cell in changed))
+        except SearchCancelled:
+            return state.found_words
+        
+        for word, wordId in invalidated:
+            if (wordId not in state.found_ids):
+                path = self.find_path(letter_grid, word)
+                if (path is not None):
+                    state.add_word(self.trie, wordId, path, word)
+        return state.found_words
+    
+    def stream_words(self, letter_grid : List[List[str]], time_budget : float | None = None,
+                     tiers : Sequence[int] = LENGTH_TIERS, cancel : threading.Event | None = None) -> Iterator[tuple[tuple[str, int], GridPath]]:
+        """
+        Yields the words of the grid, the long ones first, one length tier at a time.
+
+        Each tier runs `iterative_search` for the words of at least its minimum
+        length, which cuts every branch too short to reach it. A tier is searched
+        one start cell at a time and the new words of each start cell are yielded
+        right away, longest first, so the first words arrive within milliseconds.
+        The search stops as soon as the time budget is spent, within a tier too.
+
+        Args:
+            letter_grid: 2D list of characters representing the game board
+            time_budget: Seconds before the search stops, unlimited by default
+            tiers: Decreasing minimum word lengths of the passes
+            cancel: Set from another thread to stop the search right away
+
+        Yields:
+            (word, word id) pairs and their paths
+
+        Returns:
+            bool: True if every tier was searched
+        """
+        deadline : float | None = None if time_budget is None else time.perf_counter() + time_budget
+        state = SolveState(cancel, deadline)
+        for min_length in tiers:
+            state.count_letters(letter_grid)
+            for start in range(len(letter_grid) * len(letter_grid[0])):
+                already : int = len(state.found_words)
+                try:
+                    state.check_cancel()
+                    self.iterative_search(letter_grid, state, starts=[start], min_length=min_length)
+                except SearchCancelled:
+                    pass
+                
+                found = list(state.found_words.items())[already:]
+                yield from sorted(found, key=lambda x: len(x[0][0]), reverse=True)
+                if (state.cancelled):
+                    return False
+        return True
+    
+    def solve_stream(self, time_budget : float | None = None, cancel : threading.Event | None = None,
+                     incremental : bool = False) -> Iterator[tuple[tuple[str, int], GridPath]]:
+        """
+        Streaming version of `solve`, yields the words of the letter grid longest first.
+        `found_words` fills up as the words are yielded. Close the generator when
+        leaving it early, `cancelled` then tells the words are partial.
+
+        Cached grids, the unchanged last solved grid and, when asked, small edits of it
+        are answered at once like `solve` does, then yielded longest first. Otherwise the
+        words come from `stream_words`, and the result is only cached if every tier was searched.
+
+        Args:
+            time_budget: Seconds before the search stops, unlimited by default
+            cancel: Set from another thread to stop the search, `found_words` keeps the words yielded so far
+            incremental: Update the last solve when only a few cells changed, see `solve`
+        """
+        self.start_solving()
+        try:
+            cached = self.cache.get(self.letter_grid)
+            changed = self.changed_cells(self.letter_grid)
+        
+            if (cached is not None or changed == [] or
+                (incremental and changed is not None and len(changed) <= len(self.cell_words) // 4)):
+                if (cached is not None):
+                    self.found_words = cached
+                elif (changed):
+                    self.found_words = self.incremental_search(self.letter_grid, changed)
+                if (cached is None):
+                    self.cache.put(self.letter_grid, self.found_words)
+                self.index_paths(self.letter_grid)
+                self.cancelled = False
+                yield from sorted(self.found_words.items(), key=lambda x: len(x[0][0]), reverse=True)
+                return
+        
+            # Until the stream completes the found words are partial, even if it is abandoned
+            self.forget_paths()
+            self.found_words = {}
+            complete : bool = False
+            words = self.stream_words(self.letter_grid, time_budget, cancel=cancel)
+            try:
+                while True:
+                    try:
+                        key, path = next(words)
+                    except StopIteration as stop:
+                        complete = stop.value
+                        break
+                    self.found_words[key] = path
+                    yield key, path
+            finally:
+                words.close()
+                self.cancelled = not complete
+                if (complete):
+                    self.cache.put(self.letter_grid, self.found_words)
+                    self.index_paths(self.letter_grid)
+        finally:
+            self.is_solving = False
+    
+    def top_words(self, letter_grid : List[List[str]], k : int = 20, time_budget : float | None = None,
+                  score : Callable[[int], float] = length_points,
+                  cancel : threading.Event | None = None) -> List[tuple[float, tuple[str, int], GridPath]]:
+        """
+        Anytime branch and bound search for the K highest scoring words of the grid.
+
+        The bound of a partial path is the best score its branch could still reach,
+        given by the longest word below the node and the letters left on the
+        unvisited cells. Paths are explored depth first, most promising child first,
+        and a branch is dropped as soon as its bound can't beat the current K-th best
+        word. When the time budget is spent the best words found so far are returned.
+
+        Args:
+            letter_grid: 2D list of characters representing the game board
+            k: Number of words to keep
+            time_budget: Seconds before the search stops, unlimited by default
+            score: Points of a word from its length, must never decrease with the length
+            cancel: Set from another thread to stop the search like the time budget does
+
+        Returns:
+            Up to k (score, (word, word id), path) tuples, best first, none if k isn't positive
+        """
+        if (k <= 0):
+            return []
+        deadline : float | None = None if time_budget is None else time.perf_counter() + time_budget
+        trie : Trie = self.trie
+        colSize : int = len(letter_grid[0])
+        neighbors = neighbor_table(len(letter_grid), colSize)
+        chars : List[str] = [char for row in letter_grid for char in row]
+        total_letters : int = sum(len(char) for char in chars)
+        state = SolveState()
+        
+        tiles = TileTransitions(trie, letter_grid)
+        
+        def advance(node : int, cell : int) -> int:
+            node = tiles.child(node, tiles.codes[cell])
+            if (node < 0 or state.is_exhausted(trie, node)):
+                return -1
+            return node
+        
+        def bound(node : int, length : int) -> float:
+            return score(length + min(trie.depths[node], total_letters - length))
+        
+        best : List[tuple[float, int, tuple[str, int], GridPath]] = [] # min-heap of the current top K
+        
+        # Depth first stack of (bound, node, cell, visited, path, length), the children of a path
+        # are pushed by increasing bound so the most promising one is explored first
+        stack : list = []
+        for start in reversed(range(len(chars))):
+            node : int = advance(trie.root, start)
+            if (node >= 0):
+                length : int = len(chars[start])
+                stack.append((bound(node, length), node, start, 1 << start, (start,), length))
+        stack.sort(key=lambda entry: entry[0])
+        
+        pops : int = 0
+        while stack:
+            branchBound, node, cell, visited, path, length = stack.pop()
+            
+            # The branch can't enter the top K anymore
+            if (len(best) == k and branchBound <= best[0][0]):
+                continue
+            
+            pops += 1
+            if (pops % 64 == 0 and is_cancelled(cancel, deadline)):
+                break
+            
+            wordId : int = trie.word_ids[node]
+            if (wordId >= 0 and wordId not in state.found_ids):
+                word : str = "".join(chars[c] for c in path)
+                points : float = score(length)
+                gridPath = GridPath.from_cells(path, colSize)
+                if (len(best) < k or points > best[0][0]):
+                    entry = (points, wordId, (word, wordId), gridPath)
+                    if (len(best) < k):
+                        heapq.heappush(best, entry)
+                    else:
+                        heapq.heapreplace(best, entry)
+                state.add_word(trie, wordId, gridPath, word)
+            
+            children : list = []
+            for nextCell in neighbors[cell]:
+                if (visited >> nextCell & 1):
+                    continue
+                nextNode : int = advance(node, nextCell)
+                if (nextNode < 0):
+                    continue
+                nextLength : int = length + len(chars[nextCell])
+                children.append((bound(nextNode, nextLength), nextNode, nextCell, visited | 1 << nextCell, path + (nextCell,), nextLength))
+            children.sort(key=lambda entry: entry[0])
+            stack.extend(children)
+        
+        return [(points, key, path) for points, _, key, path in sorted(best, reverse=True)]
+    
+    def find_words(self, letter_grid : List[List[str]], engine : str = "recursive", prefilter : bool = False,
+                   state : SolveState | None = None, workers : int = 1,
+                   cancel : threading.Event | None = None, deadline : float | None = None) -> dict[tuple[str, int], GridPath]:
+        """
+        Finds every word of the grid without touching any shared state,
+        so several grids can be searched at once from different threads.
+
+        Args:
+            letter_grid: 2D list of characters representing the game board
+            engine: "recursive" for `dfs` or "iterative" for `iterative_search`,
+                both return the same words and paths, or "vector" for `vector_search`
+                which returns the same words with possibly other paths
+            prefilter: Search a sub-trie of the words that fit the letters of the grid,
+                ignored by the "vector" engine which already verifies the words of the grid
+            state: A fresh state to fill, pass one to read the search counters afterwards
+            workers: Spread the start cells over this many processes when above 1,
+                see `parallel_search`
+            cancel: Set from another thread to stop the search
+            deadline: `time.perf_counter()` time at which the search stops
+
+        Returns:
+            dict: The path of each found (word, word id) pair, only the words found
+            so far when the search was stopped
+        """
+        if (workers > 1):
+            if (prefilter or state is not None):
+                raise ValueError("A parallel solve can't use a prefilter nor return its search state")
+            return self.parallel_search(letter_grid, engine, workers, cancel, deadline)[0]
+        
+        solver : WordBoxSolver = self
+        if (prefilter and engine != "vector"):
+            solver = WordBoxSolver(self.trie.subtrie(letter_grid))
+        
+        state = state if state is not None else SolveState()
+        if (cancel is not None):
+            state.cancel = cancel
+        if (deadline is not None):
+            state.deadline = deadline
+        solver.search(letter_grid, engine, state)
+        return state.found_words
+    
+    def solve(self, engine : str = "recursive", prefilter : bool = False, workers : int = 1, use_cache : bool = True,
+              incremental : bool = False, collect_stats : bool = False, log_stats : bool = False,
+              cancel : threading.Event | None = None, time_budget : float | None = None) -> SolveStats | None:
+        """
+        Finds all the words of the letter grid and stores them in `found_words`.
+        A grid solved before, even rotated or mirrored, is taken from the cache.
+        When the grid didn't change since the last solve its words are kept.
+        
+        The search checks the cancel token and the time budget as it goes. Once
+        either fires it stops, `found_words` holds the words found so far and
+        `cancelled` is set. Partial solutions are neither cached nor reused.
+
+        Args:
+            engine: The search engine to use, see `find_words`
+            prefilter: Search a sub-trie of the words that fit the grid, see `find_words`
+            workers: Number of processes searching the start cells, see `find_words`
+            use_cache: Reuse earlier solves, from the solution cache or the last solved grid.
+                When False the grid is searched from scratch with the given engine
+            incremental: When only a few cells changed, update the last solve with
+                `incremental_search` (always the iterative engine). Off by default : after
+                a single edit it still costs 65 to 85% of a full iterative search, and more
+                than a full search on some 5x5 grids
+            collect_stats: Measure the search, also kept in `stats`
+            log_stats: Log the summary of the stats, implies collect_stats
+            cancel: Set from another thread, e.g. a key press, to stop the search
+            time_budget: Seconds before the search stops, unlimited by default
+
+        Returns:
+            The stats of the solve, or None when they aren't collected
+        """
+        self.start_solving()
+        try:
+            collect_stats = collect_stats or log_stats
+            begin : float = time.perf_counter()
+            deadline : float | None = None if time_budget is None else begin + time_budget
+            state : SolveState | None = None
+            cancelled : bool = False
+        
+            cached = self.cache.get(self.letter_grid) if use_cache else None
+            changed = self.changed_cells(self.letter_grid) if use_cache else None
+        
+            stats : SolveStats | None = SolveStats() if collect_stats else None
+            if (cached is not None):
+                self.found_words = cached
+                source : str = "cache"
+                engine = ""
+            elif (changed == []):
+                source = "unchanged"
+                engine = ""
+            elif (incremental and changed is not None and len(changed) <= len(self.cell_words) // 4):
+                state = SolveState(cancel, deadline)
+                self.found_words = self.incremental_search(self.letter_grid, changed, state)
+                source = "incremental"
+                engine = "iterative"
+                cancelled = state.cancelled
+            elif (workers > 1):
+                if (prefilter):
+                    raise ValueError("A parallel solve can't use a prefilter")
+                self.found_words, cancelled = self.parallel_search(self.letter_grid, engine, workers, cancel, deadline)
+                source = "parallel"
+            else:
+                state = SolveState(cancel, deadline)
+                if (collect_stats):
+                    state.start_times = {}
+                self.found_words = self.find_words(self.letter_grid, engine, prefilter, state=state)
+                source = "search"
+                cancelled = state.cancelled
+        
+            self.cancelled = cancelled
+            if (cancelled):
+                self.forget_paths()
+            else:
+                if (cached is None):
+                    self.cache.put(self.letter_grid, self.found_words)
+                self.index_paths(self.letter_grid)
         
-        self.trie.rebuild(foundWords=self.found_words)
+            if (stats is not None):
+                stats.source = source
+                stats.engine = engine
+                stats.cancelled = cancelled
+                if (state is not None):
+                    stats.read_state(state)
+                stats.count_words(self.found_words)
+                stats.wall_time = time.perf_counter() - begin
+                if (log_stats):
+                    stats.log()
+            self.stats = stats
+            return stats
+        finally:
+            self.is_solving = False
         
     def set_cell_positions(self, contour_info_grid : list[list[tuple[int, int, str]]]) -> None :
         self.cell_window_positions = [[(pos[0], pos[1]) for pos in row] 
@@ -0,0 +1,208 @@
+from __future__ import annotations
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, List
+
+from core.word_box_solver_paths import GridPath
+
+FoundWords = dict[tuple[str, int], GridPath]
+
+# (transpose, flip rows, flip columns) : the 8 symmetries of a square
+SYMMETRIES : tuple[tuple[bool, bool, bool], ...] = tuple(
+    (transpose, flip_rows, flip_cols)
+    for transpose in (False, True) for flip_rows in (False, True) for flip_cols in (False, True)
+)
+
+
+def symmetry_mapping(symmetry : tuple[bool, bool, bool], rowSize : int, colSize : int) -> Callable[[int, int], tuple[int, int]]:
+    """
+    Returns the function moving a cell of a rowSize x colSize grid to its place in the transformed grid.
+    The grid is transposed first, then its rows and columns are flipped.
+    """
+    transpose, flip_rows, flip_cols = symmetry
+    newRows, newCols = (colSize, rowSize) if transpose else (rowSize, colSize)
+
+    def mapping(row : int, col : int) -> tuple[int, int]:
+        if (transpose):
+            row, col = col, row
+        if (flip_rows):
+            row = newRows - 1 - row
+        if (flip_cols):
+            col = newCols - 1 - col
+        return row, col
+
+    return mapping
+
+
+def inverse_mapping(symmetry : tuple[bool, bool, bool], rowSize : int, colSize : int) -> Callable[[int, int], tuple[int, int]]:
+    """ Returns the function moving a cell of the transformed grid back to the rowSize x colSize grid """
+    transpose, flip_rows, flip_cols = symmetry
+    newRows, newCols = (colSize, rowSize) if transpose else (rowSize, colSize)
+
+    def mapping(row : int, col : int) -> tuple[int, int]:
+        if (flip_rows):
+            row = newRows - 1 - row
+        if (flip_cols):
+            col = newCols - 1 - col
+        if (transpose):
+            row, col = col, row
+        return row, col
+
+    return mapping
+
+
+def transform_grid(letter_grid : List[List[str]], symmetry : tuple[bool, bool, bool]) -> List[List[str]]:
+    """ Applies a symmetry to a grid """
+    rowSize, colSize = len(letter_grid), len(letter_grid[0])
+    mapping = symmetry_mapping(symmetry, rowSize, colSize)
+    newRows, newCols = (colSize, rowSize) if symmetry[0] else (rowSize, colSize)
+
+    grid : List[List[str]] = [[""] * newCols for _ in range(newRows)]
+    for row in range(rowSize):
+        for col in range(colSize):
+            newRow, newCol = mapping(row, col)
+            grid[newRow][newCol] = letter_grid[row][col]
+    return grid
+
+
+def grid_key(letter_grid : List[List[str]]) -> str:
+    """ Text key of a grid, cells are separated since a tile can hold several letters """
+    return f"{len(letter_grid)}x{len(letter_grid[0])}:" + "/".join(",".join(row) for row in letter_grid)
+
+
+def canonical_form(letter_grid : List[List[str]]) -> tuple[str, tuple[bool, bool, bool]]:
+    """
+    Finds the orientation of a grid shared by all of its rotations and mirrors.
+
+    Returns:
+        The key of the canonical grid and the symmetry turning the grid into it
+    """
+    return min((grid_key(transform_grid(letter_grid, symmetry)), symmetry) for symmetry in SYMMETRIES)
+
+
+class SolutionCache:
+    def __init__(self, max_entries : int = 256, path : str | Path | None = None, namespace : str = "") -> None:
+        """
+        Cache of solved grids shared by every rotated or mirrored copy of a grid.
+
+        Solutions are stored in the canonical orientation of their grid and moved
+        back to the orientation of the grid being solved on a hit. The most
+        recently used solutions are kept in memory, and every solution is
+        optionally persisted in a sqlite file so it survives restarts.
+
+        Args:
+            max_entries: Number of solutions kept in memory
+            path: The sqlite file of the on-disk store, memory only by default
+            namespace: Identifies the dictionary the solutions were found with,
+                solutions of another namespace are never returned
+        """
+        self.max_entries : int = max_entries
+        self.namespace : str = namespace
+        self.entries : OrderedDict[str, FoundWords] = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.hits : int = 0
+        self.misses : int = 0
+
+        self.db : sqlite3.Connection | None = None
+        if (path is not None):
+            self.db = sqlite3.connect(str(path), check_same_thread=False)
+            self.db.execute("CREATE TABLE IF NOT EXISTS solutions (key TEXT PRIMARY KEY, words TEXT NOT NULL)")
+            self.db.commit()
+
+    def _lookup(self, key : str) -> FoundWords | None:
+        """ Finds a canonical solution in memory then on disk """
+        found_words = self.entries.get(key)
+        if (found_words is not None):
+            self.entries.move_to_end(key)
+            return found_words
+
+        if (self.db is None):
+            return None
+
+        row = self.db.execute("SELECT words FROM solutions WHERE key = ?", (f"{self.namespace}|{key}",)).fetchone()
+        if (row is None):
+            return None
+
+        colSize : int = int(key.split(":")[0].split("x")[1])
+        found_words = {(word, wordId): GridPath.from_coordinates(path, colSize) for word, wordId, path in json.loads(row[0])}
+        self._remember(key, found_words)
+        return found_words
+
+    def _remember(self, key : str, found_words : FoundWords) -> None:
+        """ Keeps a solution in memory, evicting the least recently used one """
+        self.entries[key] = found_words
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get(self, letter_grid : List[List[str]]) -> FoundWords | None:
+        """
+        Returns the solution of the grid or of any of its rotations and mirrors.
+
+        Args:
+            letter_grid: 2D list of characters representing the game board
+
+        Returns:
+            A new dict of the found words with paths in the orientation of
+            the given grid, or None if the grid was never solved
+        """
+        key, symmetry = canonical_form(letter_grid)
+        with self.lock:
+            found_words = self._lookup(key)
+            if (found_words is None):
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        colSize : int = len(letter_grid[0])
+        mapping = inverse_mapping(symmetry, len(letter_grid), colSize)
+        return {word: GridPath.from_coordinates([mapping(row, col) for row, col in path], colSize)
+                for word, path in found_words.items()}
+
+    def put(self, letter_grid : List[List[str]], found_words : FoundWords) -> None:
+        """
+        Stores the solution of a grid in its canonical orientation.
+
+        Args:
+            letter_grid: 2D list of characters representing the game board
+            found_words: The found words of the grid and their paths
+        """
+        key, symmetry = canonical_form(letter_grid)
+        rowSize, colSize = len(letter_grid), len(letter_grid[0])
+        mapping = symmetry_mapping(symmetry, rowSize, colSize)
+        canonicalCols : int = rowSize if symmetry[0] else colSize
+        canonical : FoundWords = {word: GridPath.from_coordinates([mapping(row, col) for row, col in path], canonicalCols)
+                                  for word, path in found_words.items()}
+
+        with self.lock:
+            self._remember(key, canonical)
+            if (self.db is not None):
+                words : str = json.dumps([[word, wordId, path.tolist()] for (word, wordId), path in canonical.items()])
+                self.db.execute("INSERT OR REPLACE INTO solutions (key, words) VALUES (?, ?)", (f"{self.namespace}|{key}", words))
+                self.db.commit()
+
+    def set_namespace(self, namespace : str) -> None:
+        """ Switches to the solutions of another dictionary, the ones kept in memory are dropped """
+        with self.lock:
+            if (namespace != self.namespace):
+                self.namespace = namespace
+                self.entries.clear()
+
+    def clear(self) -> None:
+        """ Forgets every solution, in memory and on disk """
+        with self.lock:
+            self.entries.clear()
+            if (self.db is not None):
+                self.db.execute("DELETE FROM solutions")
+                self.db.commit()
+
+    def close(self) -> None:
+        """ Closes the on-disk store """
+        with self.lock:
+            if (self.db is not None):
+                self.db.close()
+                self.db = None
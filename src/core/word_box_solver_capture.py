@@ -0,0 +1,149 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List
+
+import numpy as np
+
+# Extensions read by the image file backend
+IMAGE_SUFFIXES : set[str] = {".png", ".jpg", ".jpeg", ".bmp"}
+
+
+@dataclass
+class Capture:
+    """
+    A captured frame of the game window.
+
+    Attributes:
+        image: BGR or BGRA pixels, (height, width, channels). It may be a read-only
+            view over the capture buffer, the pipeline never writes to it
+        left: Screen x of the top left pixel of the frame
+        top: Screen y of the top left pixel of the frame
+    """
+    image : np.ndarray
+    left : int = 0
+    top : int = 0
+
+
+class CaptureBackend(ABC):
+    """ Source of the frames scanned by `ImgProcessing.pipeline` """
+
+    @abstractmethod
+    def capture(self) -> Capture | None:
+        """ Returns the current frame, or None when there is nothing to capture """
+
+
+class GdiCapture(CaptureBackend):
+    def __init__(self, find_window : Callable[[], int | None]) -> None:
+        """
+        Captures the client area of a window with Windows GDI (requires pywin32).
+
+        The bitmap bits are wrapped in a NumPy array without any copy nor encoding.
+
+        Args:
+            find_window: Returns the handle of the game window, or None if it isn't open
+        """
+        self.find_window = find_window
+
+    def capture(self) -> Capture | None:
+        import win32con
+        import win32gui
+        import win32ui
+
+        hwnd = self.find_window()
+        if not hwnd:
+            return None
+
+        # Get only the client window Dimensions
+        left, top = win32gui.ClientToScreen(hwnd, (0, 0))
+        right, bottom = win32gui.ClientToScreen(hwnd, win32gui.GetClientRect(hwnd)[2:])
+        width = right - left
+        height = bottom - top
+
+        hwndDC = win32gui.GetDC(hwnd) # Retrieve the device context of the entire window
+        mfcDC = win32ui.CreateDCFromHandle(hwndDC) # Wraps hwndDC into a PyCDC object
+        saveDC = mfcDC.CreateCompatibleDC() # creates a memory device context compatible with the (mfcDC) for bitmap
+        saveBitMap = win32ui.CreateBitmap()
+        try:
+            saveBitMap.CreateCompatibleBitmap(mfcDC, width, height)
+            saveDC.SelectObject(saveBitMap)
+
+            # Copy window image to bitmap
+            saveDC.BitBlt((0, 0), (width, height), mfcDC, (0, 0), win32con.SRCCOPY)
+
+            # 32 bits per pixel, rows are top down and already 4 byte aligned
+            bmpinfo = saveBitMap.GetInfo()
+            bits : bytes = saveBitMap.GetBitmapBits(True)
+        finally:
+            win32gui.DeleteObject(saveBitMap.GetHandle())
+            saveDC.DeleteDC()
+            mfcDC.DeleteDC()
+            win32gui.ReleaseDC(hwnd, hwndDC)
+
+        image = np.frombuffer(bits, dtype=np.uint8).reshape(bmpinfo["bmHeight"], bmpinfo["bmWidth"], 4)
+        return Capture(image, left, top)
+
+
+class ImageFileCapture(CaptureBackend):
+    def __init__(self, path : str | Path, loop : bool = True) -> None:
+        """
+        Reads the frames from an image file, or from every image of a directory
+        in name order, one per capture. Lets the pipeline run without the game.
+
+        Args:
+            path: An image file or a directory of images
+            loop: Start over once every image of the directory was returned
+        """
+        path = Path(path)
+        self.paths : List[Path] = (
+            sorted(p for p in path.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES) if path.is_dir() else [path]
+        )
+        self.loop : bool = loop
+        self.position : int = 0
+
+    def capture(self) -> Capture | None:
+        import cv2
+
+        if (self.position >= len(self.paths)):
+            if (not self.loop or not self.paths):
+                return None
+            self.position = 0
+
+        image = cv2.imread(str(self.paths[self.position]))
+        self.position += 1
+        return Capture(image) if image is not None else None
+
+
+class BufferCapture(CaptureBackend):
+    def __init__(self, buffer, width : int, height : int, channels : int = 4,
+                 left : int = 0, top : int = 0) -> None:
+        """
+        Serves a raw pixel buffer (BGR or BGRA rows, no padding) filled by another
+        capture library or a test, viewed as an array without copying.
+
+        Args:
+            buffer: Any object exposing the buffer protocol, updated in place or
+                replaced with `set_buffer` between captures
+            width, height, channels: Layout of the pixels
+            left, top: Screen position of the frame
+        """
+        self.width : int = width
+        self.height : int = height
+        self.channels : int = channels
+        self.left : int = left
+        self.top : int = top
+        self.set_buffer(buffer)
+
+    def set_buffer(self, buffer) -> None:
+        """
+        Raises:
+            ValueError: If the buffer doesn't hold width * height * channels bytes
+        """
+        view = memoryview(buffer).cast("B")
+        if (len(view) != self.width * self.height * self.channels):
+            raise ValueError(f"Expected a buffer of {self.width}x{self.height}x{self.channels} bytes, got {len(view)}")
+        self.image : np.ndarray = np.frombuffer(view, dtype=np.uint8).reshape(self.height, self.width, self.channels)
+
+    def capture(self) -> Capture | None:
+        return Capture(self.image, self.left, self.top)
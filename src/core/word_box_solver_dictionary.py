@@ -0,0 +1,296 @@
+from __future__ import annotations
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, List, Sequence
+
+if TYPE_CHECKING:
+    from core.word_box_solver_algo import Trie
+
+# Bumped whenever the layout of the compiled file changes
+DICTIONARY_VERSION : int = 5
+DICTIONARY_MAGIC : bytes = b"WBDICT\0\0"
+
+# magic, version, checksum of the source word list, node count, word count, word blob size
+HEADER = struct.Struct("<8sI32sIII")
+ALIGNMENT : int = 8
+
+
+def source_checksum(source_path : str | Path) -> bytes:
+    """ Returns the sha256 digest of the source word list file """
+    digest = hashlib.sha256()
+    with open(source_path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def default_artifact_path(source_path : str | Path) -> Path:
+    """ The compiled dictionary is stored next to its source word list """
+    return Path(source_path).with_suffix(".wbdict")
+
+
+def _align(offset : int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+# Words per front-coded block, a word is decoded from the start of its block
+BLOCK_SIZE : int = 8
+
+
+def _write_varint(out : bytearray, value : int) -> None:
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(blob : memoryview | bytes, offset : int) -> tuple[int, int]:
+    """ Returns the value and the offset following it """
+    value : int = blob[offset]
+    offset += 1
+    if (value < 0x80):
+        return value, offset
+    value &= 0x7F
+    shift : int = 7
+    while True:
+        byte : int = blob[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if (byte < 0x80):
+            return value, offset
+        shift += 7
+
+
+def front_code(words : Sequence[str]) -> tuple[array, bytes]:
+    """
+    Encodes sorted words as a front-coded string table.
+
+    The utf-8 words are cut in blocks of BLOCK_SIZE. The first word of a block is
+    stored whole (length, bytes), the next ones as the length of the prefix shared
+    with the previous word, then the length and bytes of the rest. Word ids are
+    their position in the table, so no permutation has to be stored.
+
+    Returns:
+        The start offset of every block plus the end offset, and the encoded blocks
+
+    Raises:
+        ValueError: If the words are not sorted by their utf-8 bytes
+    """
+    block_offsets : array = array("I")
+    blob = bytearray()
+    previous : bytes = b""
+    for wordId, text in enumerate(words):
+        word : bytes = text.encode("utf-8")
+        if (word < previous):
+            raise ValueError(f"word {wordId} is out of order, front coding needs sorted words")
+        if (wordId % BLOCK_SIZE == 0):
+            block_offsets.append(len(blob))
+            shared : int = 0
+        else:
+            shared = 0
+            limit : int = min(len(word), len(previous))
+            while shared < limit and word[shared] == previous[shared]:
+                shared += 1
+            _write_varint(blob, shared)
+        _write_varint(blob, len(word) - shared)
+        blob += word[shared:]
+        previous = word
+    block_offsets.append(len(blob))
+    return block_offsets, bytes(blob)
+
+
+class FrontCodedTable:
+    def __init__(self, block_offsets : Sequence[int], blob : memoryview | bytes, count : int) -> None:
+        """
+        Read-only list of sorted words stored as a front-coded string table (see `front_code`).
+        A word is decoded on access by replaying at most BLOCK_SIZE entries of its block.
+
+        Args:
+            block_offsets: Start offset of every block in the blob, plus the end offset
+            blob: The encoded blocks
+            count: Number of words
+        """
+        self.block_offsets = block_offsets
+        self.blob = blob
+        self.count : int = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index : int) -> str:
+        if (index < 0):
+            index += self.count
+        if (not 0 <= index < self.count):
+            raise IndexError("word id out of range")
+
+        blob = self.blob
+        offset : int = self.block_offsets[index // BLOCK_SIZE]
+
+        # Lengths are varints, but nearly always a single byte
+        length : int = blob[offset]
+        offset += 1
+        if (length >= 0x80):
+            length, offset = _read_varint(blob, offset - 1)
+        word = bytearray(blob[offset : offset + length])
+        offset += length
+        for _ in range(index % BLOCK_SIZE):
+            shared : int = blob[offset]
+            length = blob[offset + 1]
+            offset += 2
+            if (shared >= 0x80 or length >= 0x80):
+                shared, offset = _read_varint(blob, offset - 2)
+                length, offset = _read_varint(blob, offset)
+            del word[shared:]
+            word += blob[offset : offset + length]
+            offset += length
+        return word.decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        """ Decodes every word once, in id order """
+        blob = self.blob
+        offset : int = 0
+        word : bytes = b""
+        for wordId in range(self.count):
+            shared : int = 0
+            if (wordId % BLOCK_SIZE != 0):
+                shared, offset = _read_varint(blob, offset)
+            length, offset = _read_varint(blob, offset)
+            word = word[:shared] + bytes(blob[offset : offset + length])
+            offset += length
+            yield str(word, "utf-8")
+
+
+class CompiledDictionary:
+    def __init__(self, path : str | Path) -> None:
+        """
+        Memory maps a compiled dictionary file and exposes its sections as
+        zero-copy views. The pages are shared by every process mapping the file.
+
+        Args:
+            path: Path of the compiled dictionary
+
+        Raises:
+            ValueError: If the file is not a compiled dictionary of the current version or is truncated
+        """
+        self.path : Path = Path(path)
+        with open(self.path, "rb") as file:
+            self.buffer : mmap.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(self.buffer)
+        if (len(view) < HEADER.size):
+            raise ValueError(f"{self.path} is not a compiled dictionary")
+
+        magic, version, checksum, node_count, word_count, blob_size = HEADER.unpack_from(view)
+        if (magic != DICTIONARY_MAGIC or version != DICTIONARY_VERSION):
+            raise ValueError(f"{self.path} is not a version {DICTIONARY_VERSION} compiled dictionary")
+
+        self.checksum : bytes = checksum
+        self.node_count : int = node_count
+
+        offset : int = _align(HEADER.size)
+
+        def section(typecode : str, length : int) -> memoryview:
+            """ Raises ValueError before slicing past the end of a truncated file """
+            nonlocal offset
+            size : int = length * array(typecode).itemsize
+            if (offset + size > len(view)):
+                raise ValueError(f"{self.path} is truncated")
+            sub = view[offset : offset + size].cast(typecode)
+            offset = _align(offset + size)
+            return sub
+
+        self.child_masks : memoryview = section("I", node_count)
+        self.first_child : memoryview = section("I", node_count)
+        self.word_ids : memoryview = section("i", node_count)
+        self.counts : memoryview = section("I", node_count)
+        self.subtree_masks : memoryview = section("I", node_count)
+        self.depths : memoryview = section("H", node_count)
+        block_offsets : memoryview = section("I", (word_count + BLOCK_SIZE - 1) // BLOCK_SIZE + 1)
+        self.words : FrontCodedTable = FrontCodedTable(block_offsets, section("B", blob_size), word_count)
+        
+        # Letter histogram index, one bitset over the word ids per letter and level
+        bitset_size : int = (word_count + 7) // 8
+        self.all_words : memoryview = section("B", bitset_size)
+        level_counts : memoryview = section("I", 26)
+        self.letter_levels : List[List[memoryview]] = [
+            [section("B", bitset_size) for _ in range(level_counts[letter])] for letter in range(26)
+        ]
+
+
+def write_dictionary(path : str | Path, trie : Trie, checksum : bytes) -> None:
+    """
+    Serializes a compiled trie and its words, as a front-coded string table, to a binary file.
+
+    The arrays are written in native byte order, each section aligned to 8 bytes
+    so it can be cast in place once mapped. The file is written to a temporary
+    path first and moved over the target so readers never see a partial file.
+
+    Args:
+        path: Destination of the compiled dictionary
+        trie: A full trie on which `createTrie` has been called
+        checksum: Checksum of the source word list the trie was built from
+    """
+    path = Path(path)
+    block_offsets, blob = front_code(trie.words)
+
+    header : bytes = HEADER.pack(
+        DICTIONARY_MAGIC, DICTIONARY_VERSION, checksum,
+        len(trie.child_masks), len(trie.words), len(blob)
+    )
+
+    tmp_path : Path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as file:
+        def write_section(data : bytes) -> None:
+            file.write(data)
+            file.write(b"\0" * (_align(file.tell()) - file.tell()))
+
+        write_section(header)
+        for section in (trie.child_masks, trie.first_child, trie.word_ids, trie.counts, trie.subtree_masks, trie.depths, block_offsets):
+            write_section(section.tobytes())
+        write_section(blob)
+        
+        index = trie.letter_index
+        write_section(index.all_words)
+        write_section(array("I", [len(level) for level in index.levels]).tobytes())
+        for level in index.levels:
+            for bitset in level:
+                write_section(bitset)
+
+    os.replace(tmp_path, path)
+
+
+def open_dictionary(path : str | Path, checksum : bytes) -> CompiledDictionary | None:
+    """
+    Maps a compiled dictionary if it exists and was built from the expected source.
+
+    Returns:
+        The mapped dictionary, or None if it is missing, outdated or corrupted
+    """
+    try:
+        compiled = CompiledDictionary(path)
+    except (OSError, ValueError):
+        return None
+
+    if (compiled.checksum != checksum):
+        return None
+    return compiled
+
+
+def main(argv : List[str]) -> None:
+    """ Build step : python -m core.word_box_solver_dictionary [wordList.json] [output] """
+    from core import word_box_solver_algo as algo
+
+    source = argv[0] if len(argv) > 0 else algo.WORD_LIST_PATH
+    target = argv[1] if len(argv) > 1 else default_artifact_path(source)
+
+    trie = algo.Trie.compile(source, target)
+    print(f"Compiled {len(trie.words)} words ({len(trie.counts)} nodes) to {target}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
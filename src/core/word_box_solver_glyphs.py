@@ -0,0 +1,309 @@
+from __future__ import annotations
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, List, Sequence
+
+import cv2
+import numpy as np
+
+# Side of the normalized glyph, every crop becomes a GLYPH_SIZE x GLYPH_SIZE feature vector
+GLYPH_SIZE : int = 20
+
+# Labels a tile can hold, multi-letter tiles are recognized as a whole
+GLYPH_LABELS : List[str] = [chr(c) for c in range(ord("a"), ord("z") + 1)] + ["qu"]
+
+FONTS_DIR : Path = Path(__file__).resolve().parent.parent / "Fonts" / "Poppins"
+BOOTSTRAP_FONTS : List[str] = ["Poppins-Regular.ttf", "Poppins-Medium.ttf", "Poppins-SemiBold.ttf", "Poppins-Bold.ttf"]
+
+
+def normalize_glyph(img : np.ndarray) -> np.ndarray | None:
+    """
+    Turns a binarized letter crop into a unit feature vector.
+
+    The glyph color is the one missing from the border of the crop, so dark
+    letters on a light tile and light letters on a dark tile look the same.
+    The glyph is cut to its bounding box and centered on a square keeping its
+    aspect ratio, which tells thin letters (I, J, L) apart, then scaled down.
+
+    Args:
+        img: Grayscale crop of a single tile
+
+    Returns:
+        The zero mean, unit norm vector of GLYPH_SIZE * GLYPH_SIZE floats,
+        or None if the crop holds no glyph
+    """
+    if (img.ndim == 3):
+        img = img[:, :, 0]
+    if (img.size == 0):
+        return None
+
+    border = np.concatenate((img[0], img[-1], img[:, 0], img[:, -1]))
+    glyph = img < 128 if border.mean() >= 128 else img >= 128
+
+    rows = np.flatnonzero(glyph.any(axis=1))
+    cols = np.flatnonzero(glyph.any(axis=0))
+    if (not len(rows) or not len(cols)):
+        return None
+    glyph = glyph[rows[0] : rows[-1] + 1, cols[0] : cols[-1] + 1]
+
+    h, w = glyph.shape
+    side = max(h, w)
+    square = np.zeros((side, side), dtype=np.float32)
+    top, left = (side - h) // 2, (side - w) // 2
+    square[top : top + h, left : left + w] = glyph
+
+    vector = cv2.resize(square, (GLYPH_SIZE, GLYPH_SIZE), interpolation=cv2.INTER_AREA).ravel()
+    vector -= vector.mean()
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm > 0 else None
+
+
+def glyph_hash(img : np.ndarray) -> str | None:
+    """
+    Perceptual hash of a binarized crop : the normalized glyph (see `normalize_glyph`)
+    is scaled down to 8x8 and every cell above the mean sets a bit. Crops of the
+    same glyph at other sizes or positions get the same hash.
+
+    Returns:
+        The 64 bits as 16 hex digits, or None if the crop holds no glyph
+    """
+    vector = normalize_glyph(img)
+    if (vector is None):
+        return None
+    small = cv2.resize(vector.reshape(GLYPH_SIZE, GLYPH_SIZE), (8, 8), interpolation=cv2.INTER_AREA).ravel()
+    bits = np.packbits(small > small.mean())
+    return bits.tobytes().hex()
+
+
+def render_glyph(text : str, font_path : str | Path, size : int = 64) -> np.ndarray:
+    """ Draws black text on a white tile with a TrueType font (requires Pillow) """
+    from PIL import Image, ImageDraw, ImageFont
+
+    font = ImageFont.truetype(str(font_path), size)
+    image = Image.new("L", (size * 3, size * 2), 255)
+    ImageDraw.Draw(image).text((size // 2, size // 4), text, fill=0, font=font)
+    return np.asarray(image)
+
+
+class GlyphClassifier:
+    def __init__(self, max_per_label : int = 64, min_confidence : float = 0.85, min_margin : float = 0.05) -> None:
+        """
+        Nearest neighbor classifier of tile glyphs, over normalized binarized crops.
+
+        The game draws its letters in one font, so a handful of templates per
+        letter recognizes a crop with a single matrix product (microseconds)
+        where the OCR network takes tens of milliseconds.
+
+        Args:
+            max_per_label: Learned templates kept per label on top of the rendered ones,
+                the oldest learned ones are replaced
+            min_confidence: Below this confidence a crop should go to the OCR instead
+            min_margin: Similarity gap to the best other label under which the
+                match is ambiguous, the confidence is then scaled down
+        """
+        self.max_per_label : int = max_per_label
+        self.min_confidence : float = min_confidence
+        self.min_margin : float = min_margin
+
+        self.templates : np.ndarray = np.zeros((0, GLYPH_SIZE * GLYPH_SIZE), dtype=np.float32)
+        self.labels : List[str] = []
+        self.rendered : int = 0 # leading templates rendered from the fonts, never replaced
+        self.changed : bool = False # templates were added since the last save
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    @classmethod
+    def from_fonts(cls, font_paths : Iterable[str | Path] | None = None, **kwargs) -> GlyphClassifier:
+        """ Bootstraps templates of every upper case label rendered with the bundled fonts """
+        classifier = cls(**kwargs)
+        for font_path in (font_paths if font_paths is not None else [FONTS_DIR / name for name in BOOTSTRAP_FONTS]):
+            for label in GLYPH_LABELS:
+                classifier.add(label, render_glyph(label.capitalize(), font_path))
+        classifier.rendered = len(classifier)
+        return classifier
+
+    @classmethod
+    def load(cls, path : str | Path, **kwargs) -> GlyphClassifier:
+        """
+        Raises:
+            OSError: If the file can't be read
+        """
+        classifier = cls(**kwargs)
+        with np.load(path) as data:
+            classifier.templates = data["templates"].astype(np.float32)
+            classifier.labels = [str(label) for label in data["labels"]]
+            classifier.rendered = int(data["rendered"]) if "rendered" in data else 0
+        return classifier
+
+    @classmethod
+    def load_or_bootstrap(cls, path : str | Path, **kwargs) -> GlyphClassifier:
+        """ Loads the saved templates, or renders the bundled fonts if there are none yet """
+        try:
+            return cls.load(path, **kwargs)
+        except (OSError, KeyError, ValueError):
+            return cls.from_fonts(**kwargs)
+
+    def save(self, path : str | Path) -> None:
+        """ Writes the templates, through a temporary file so a crash never leaves a partial one """
+        path = Path(path)
+        tmp_path : Path = path.with_name(f"{path.name}.{os.getpid()}.tmp.npz")
+        np.savez_compressed(tmp_path, templates=self.templates, labels=np.array(self.labels), rendered=self.rendered)
+        os.replace(tmp_path, path)
+        self.changed = False
+
+    def add(self, label : str, img : np.ndarray) -> bool:
+        """
+        Learns a labeled crop. Once a label has `max_per_label` learned templates,
+        the oldest of them is replaced, the templates rendered from the fonts are kept.
+
+        Returns:
+            bool: False if the crop holds no glyph
+        """
+        vector = normalize_glyph(img)
+        if (vector is None):
+            return False
+
+        learned : List[int] = [i for i in range(self.rendered, len(self.labels)) if self.labels[i] == label]
+        if (len(learned) >= self.max_per_label):
+            self.templates = np.delete(self.templates, learned[0], axis=0)
+            del self.labels[learned[0]]
+
+        self.templates = np.vstack((self.templates, vector[np.newaxis]))
+        self.labels.append(label)
+        self.changed = True
+        return True
+
+    def add_directory(self, directory : str | Path) -> int:
+        """
+        Learns the crops saved as <directory>/<label>/<any name>.png
+
+        Returns:
+            int: Number of crops learned
+        """
+        count : int = 0
+        for label_dir in sorted(Path(directory).iterdir()):
+            if (not label_dir.is_dir()):
+                continue
+            for image_path in sorted(label_dir.glob("*.png")):
+                img = cv2.imread(str(image_path), cv2.IMREAD_GRAYSCALE)
+                if (img is not None and self.add(label_dir.name.lower(), img)):
+                    count += 1
+        return count
+
+    def classify(self, crops : Sequence[np.ndarray]) -> List[tuple[str, float]]:
+        """
+        Recognizes crops against the templates.
+
+        The confidence is the cosine similarity with the closest template, scaled
+        down when a template of another label is almost as close.
+
+        Args:
+            crops: Binarized crops of single tiles
+
+        Returns:
+            The label and confidence of every crop, ("", 0.0) for an empty crop
+            or when there are no templates
+        """
+        results : List[tuple[str, float]] = [("", 0.0)] * len(crops)
+        vectors = [normalize_glyph(crop) for crop in crops]
+        valid : List[int] = [i for i, vector in enumerate(vectors) if vector is not None]
+        if (not valid or not self.labels):
+            return results
+
+        similarities = np.stack([vectors[i] for i in valid]) @ self.templates.T
+        labels = np.array(self.labels)
+        for row, i in enumerate(valid):
+            best : int = int(np.argmax(similarities[row]))
+            label : str = self.labels[best]
+            similarity : float = float(similarities[row, best])
+
+            others = similarities[row, labels != label]
+            margin : float = similarity - float(others.max()) if len(others) else 1.0
+            confidence : float = similarity if margin >= self.min_margin else similarity * max(margin, 0.0) / self.min_margin
+            results[i] = (label, round(max(confidence, 0.0), 2))
+        return results
+
+
+class GlyphCache:
+    def __init__(self, max_entries : int = 4096, path : str | Path | None = None) -> None:
+        """
+        Bounded cache of recognized glyphs, hash (see `glyph_hash`) to (letter, confidence).
+
+        Letters corrected by the user are authoritative : they replace whatever
+        was recognized and are evicted last. The least recently used entries
+        are evicted first, in memory and on disk.
+
+        Args:
+            max_entries: Number of glyphs kept
+            path: The sqlite file persisting the glyphs, memory only by default
+        """
+        self.max_entries : int = max_entries
+        self.entries : OrderedDict[str, tuple[str, float, bool]] = OrderedDict() # letter, confidence, authoritative
+        self.lock = threading.Lock()
+
+        self.hits : int = 0
+        self.misses : int = 0
+
+        self.db : sqlite3.Connection | None = None
+        if (path is not None):
+            self.db = sqlite3.connect(str(path), check_same_thread=False)
+            self.db.execute("CREATE TABLE IF NOT EXISTS glyphs (hash TEXT PRIMARY KEY, letter TEXT NOT NULL, "
+                            "confidence REAL NOT NULL, authoritative INTEGER NOT NULL, used INTEGER NOT NULL)")
+            self.db.commit()
+            rows = self.db.execute("SELECT hash, letter, confidence, authoritative FROM glyphs ORDER BY used").fetchall()
+            for key, letter, confidence, authoritative in rows:
+                self.entries[key] = (letter, confidence, bool(authoritative))
+            self._evict()
+
+    def get(self, key : str) -> tuple[str, float] | None:
+        """ Returns the letter and confidence of a glyph hash, or None if it is unknown """
+        with self.lock:
+            entry = self.entries.get(key)
+            if (entry is None):
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[0], entry[1]
+
+    def put(self, key : str, letter : str, confidence : float, authoritative : bool = False) -> None:
+        """ Stores a recognized glyph, an authoritative letter is only replaced by another one """
+        with self.lock:
+            previous = self.entries.get(key)
+            if (previous is not None and previous[2] and not authoritative):
+                return
+            self.entries[key] = (letter, confidence, authoritative)
+            self.entries.move_to_end(key)
+            self._evict()
+
+    def save(self) -> None:
+        """ Persists the entries and their recency, called once per scan instead of once per glyph """
+        with self.lock:
+            if (self.db is None):
+                return
+            self.db.execute("DELETE FROM glyphs")
+            self.db.executemany(
+                "INSERT INTO glyphs (hash, letter, confidence, authoritative, used) VALUES (?, ?, ?, ?, ?)",
+                [(key, letter, confidence, int(authoritative), used)
+                 for used, (key, (letter, confidence, authoritative)) in enumerate(self.entries.items())]
+            )
+            self.db.commit()
+
+    def _evict(self) -> None:
+        """ Drops the least recently used glyphs, the recognized ones before the corrected ones """
+        while len(self.entries) > self.max_entries:
+            key = next((k for k, entry in self.entries.items() if not entry[2]), None)
+            if (key is None):
+                key = next(iter(self.entries))
+            del self.entries[key]
+
+    def close(self) -> None:
+        """ Closes the on-disk store """
+        with self.lock:
+            if (self.db is not None):
+                self.db.close()
+                self.db = None
@@ -1,26 +1,78 @@
-from pathlib import Path
 from typing import List
 import re
-import win32gui
-import win32ui
-import win32con
+import time
 
 import math
 from easyocr import Reader
 from torch import cuda
 
-from PIL import Image
 import cv2
+import numpy as np
+
+from core.word_box_solver_capture import CaptureBackend, GdiCapture
+from core.word_box_solver_glyphs import GLYPH_LABELS, GlyphCache, GlyphClassifier, glyph_hash
+
+#  EasyOCR character whitelist for letter recognition
+OCR_ALLOWLIST : str = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz|0'"
+
+# Templates of the glyph classifier, learned from the confident OCR results
+GLYPHS_PATH : str = "glyphs.npz"
+
+# EasyOCR results at least this confident are learned by the glyph classifier
+LEARN_CONFIDENCE : float = 0.9
+
+# Recognized glyphs by perceptual hash, with the letters corrected in the grid editor
+GLYPH_CACHE_PATH : str = "glyphs.sqlite3"
+
+
+def to_gray(img : np.ndarray) -> np.ndarray:
+    """ Grayscale copy of a gray, BGR or BGRA capture """
+    if (img.ndim == 2 or img.shape[2] == 1):
+        return img.reshape(img.shape[:2]).copy()
+    return cv2.cvtColor(img, cv2.COLOR_BGRA2GRAY if img.shape[2] == 4 else cv2.COLOR_BGR2GRAY)
+
+
+def preprocess_letters(img : np.ndarray) -> np.ndarray:
+    """
+    Preprocesses a crop or a whole frame for OCR.
+    
+    Steps:
+    - Convert to grayscale
+    - Apply Gaussian blur for noise reduction
+    - Threshold to binary image
+    
+    Args:
+        img: Image region containing letters
+        
+    Returns:
+        Preprocessed binary image ready for OCR
+    """
+    gray = to_gray(img)
+
+    blur = cv2.GaussianBlur(gray, (5,5), 0)
+    _,thresh = cv2.threshold(blur, 140, 255, cv2.THRESH_BINARY)
+    return thresh
 
 
 class ImgProcessing:
-    def __init__(self, app):
+    def __init__(self, app, capture : CaptureBackend | None = None, ocr_mode : str = "crops",
+                 classifier : GlyphClassifier | None = None, glyphs_path : str | None = GLYPHS_PATH,
+                 glyph_cache : GlyphCache | None = None):
         """
         Initializes the image processing pipeline.
         
         Args:
             app: Main application instance for accessing shared state and controllers
+            capture: Where the frames come from, the game window (Windows GDI) by default
+            ocr_mode: "crops" to recognize upscaled crops of the letters (see `easyOCRbatch`)
+                or "frame" to recognize the letter boxes on the whole frame (see `easyOCRboxes`)
+            classifier: Recognizes the glyphs before EasyOCR, loaded from glyphs_path
+                or bootstrapped from the bundled fonts by default
+            glyphs_path: Where the templates learned from EasyOCR are saved, never saved if None
+            glyph_cache: Letters of the glyphs seen before, persisted in GLYPH_CACHE_PATH by default
         """
+        if ocr_mode not in ("crops", "frame"):
+            raise ValueError(f"Unknown OCR mode: {ocr_mode}")
         self.app = app
         self.reader : Reader = Reader(['en'], gpu=cuda.is_available()) # Initialize English OCR reader and uses gpu if available
         self.contour_info_grid: list = []
@@ -31,9 +83,20 @@ class ImgProcessing:
         self.is_processing :bool= False
         self.img = None
         self.lettersInfo: List[tuple[int, int, str]] = []
-
-        screenshot_dir: Path = Path("screenshots")
-        self.image_path : Path = screenshot_dir / "wordbox.png" 
+        self.timings : dict[str, float] = {} # Seconds spent on each step of the last pipeline run
+        
+        self.capture : CaptureBackend = capture if capture is not None else GdiCapture(app.screenshot_window_available)
+        self.ocr_mode : str = ocr_mode
+        
+        self.glyphs_path : str | None = glyphs_path
+        if classifier is None:
+            classifier = GlyphClassifier.load_or_bootstrap(glyphs_path) if glyphs_path else GlyphClassifier.from_fonts()
+        self.classifier : GlyphClassifier = classifier
+        self.glyph_cache : GlyphCache = glyph_cache if glyph_cache is not None else GlyphCache(path=GLYPH_CACHE_PATH)
+        
+        # Hash and binarized crop of every letter of the last scan, by letter center
+        self.glyph_hashes : dict[tuple[int, int], str] = {}
+        self.glyph_crops : dict[tuple[int, int], np.ndarray] = {}
 
     def set_window_position(self, hwnd : int) -> None:
         """
@@ -45,82 +108,79 @@ class ImgProcessing:
         Args:
             hwnd: Window handle identifier
         """
+        import win32gui
         self.window_left, self.window_top = win32gui.ClientToScreen(hwnd, (0, 0))
     
-    def _screenshot_window(self) -> None:
+    def _screenshot_window(self) -> bool:
         """
-        Captures a screenshot of the game window and saves it to the screenshot direcotry.
+        Captures the game window from the capture backend into `self.img`.
         
-        The method:
-        1. Verifies the target window is available
-        2. Calculates window dimensions and position
-        3. Uses Windows GDI to capture the window contents
-        4. Saves the screenshot as 'wordbox.png' for processing
+        The frame is used as is, without any copy nor going through the disk,
+        so `self.img` may be a read-only view over the capture buffer.
         
-        Raises:
-            Windows API errors if window capture fails
+        Returns:
+            bool: False if nothing could be captured
         """
-        hwnd = self.app.screenshot_window_available()
-        
-        if not hwnd:
-            return None
-        
-        # Get only the client window Dimensions
-        left, top = win32gui.ClientToScreen(hwnd, (0, 0))
-        right, bottom = win32gui.ClientToScreen(hwnd, win32gui.GetClientRect(hwnd)[2:])
-        
-        self.window_left = left
-        self.window_top = top
+        frame = self.capture.capture()
+        if frame is None:
+            self.img = None
+            return False
+        
+        self.window_left = frame.left
+        self.window_top = frame.top
+        self.img = frame.image
+        return True
+
+    def easyOCRbatch(self, crops : List[np.ndarray]) -> List[tuple[str, float]]:
+        """
+        Recognizes every letter crop in a single call, skipping the text detector.
         
-        # Entire window dimensions
-        # left, top, right, bottom = win32gui.GetWindowRect(hwnd)
+        The crops are laid side by side on one grayscale canvas and the recognizer
+        is given the box of each crop, so the boxes are read together (one batch
+        on the gpu) instead of running a detector and a recognizer pass per crop.
         
-        # Calculate window dimensions
-        width = right - left
-        height = bottom - top
+        Args:
+            crops: Preprocessed grayscale letter images
         
-        # Get the window's device context (DC)
-        hwndDC = win32gui.GetDC(hwnd) # Retrieve the device context of the entire window
-        mfcDC = win32ui.CreateDCFromHandle(hwndDC) # Wraps hwndDC into a PyCDC object
-        saveDC = mfcDC.CreateCompatibleDC() # creates a memory device context compatible with the (mfcDC) for bitmap
+        Returns:
+            The text and confidence of every crop, in the order of the crops
+        """
+        if not crops:
+            return []
+        
+        canvas = np.zeros((max(crop.shape[0] for crop in crops), sum(crop.shape[1] for crop in crops)), dtype=np.uint8)
+        boxes : List[List[int]] = [] # [x_min, x_max, y_min, y_max]
+        left = 0
+        for crop in crops:
+            h, w = crop.shape[:2]
+            canvas[:h, left : left + w] = crop
+            boxes.append([left, left + w, 0, h])
+            left += w
+        
+        return self.easyOCRboxes(canvas, boxes)
+
+    def easyOCRboxes(self, image : np.ndarray, boxes : List[List[int]]) -> List[tuple[str, float]]:
+        """
+        Runs only the EasyOCR recognizer on given regions of an image, in one call.
         
-        # create bitmap to hold screenshot
-        saveBitMap = win32ui.CreateBitmap()
-        saveBitMap.CreateCompatibleBitmap(mfcDC, width, height)
-        saveDC.SelectObject(saveBitMap)
+        Args:
+            image: Grayscale image holding the letters
+            boxes: [x_min, x_max, y_min, y_max] of every letter, inside the image
         
-        # Copy window image to bitmap
-        saveDC.BitBlt((0, 0), (width, height), mfcDC, (0, 0), win32con.SRCCOPY)
+        Returns:
+            The text and confidence of every box, in the order of the boxes
+        """
+        if not boxes:
+            return []
         
-        # Convert bitmap to PIL and save
-        bmpinfo = saveBitMap.GetInfo()
-        bmpstr = saveBitMap.GetBitmapBits(True)
-        image = Image.frombuffer("RGB", (bmpinfo["bmWidth"], bmpinfo["bmHeight"]), bmpstr, "raw", "BGRX", 0, 1)
+        results = self.reader.recognize(image, horizontal_list=boxes, free_list=[], allowlist=OCR_ALLOWLIST,
+                                        batch_size=len(boxes), detail=1)
         
-
-        image.save(self.image_path)    
-
-
-    def easyOCRres(self, contour) -> tuple[str, float]:
-        """ 
-        Easy OCR determines wether the contour is a text or not and 
-        returns the final text (if any) and its confidence value 
-        """
-
-        #  EasyOCR character whitelist for letter recognition
-        results = self.reader.readtext(contour, allowlist="ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz|0'")        
-        finalText = ""
-        finalProb = 0
-        count = 1e-10
+        # Results carry the corners of their box, the top left corner gives back the box
+        by_corner : dict[tuple[int, int], tuple[str, float]] = {}
         for (bbox, text, prob) in results:
-            finalText += text
-            finalProb += prob
-            count += 1
-            
-        if (finalText == "0") :
-            finalText ="o"
-        
-        return (finalText, round(finalProb/count, 2))
+            by_corner[(int(bbox[0][0]), int(bbox[0][1]))] = ("o" if text == "0" else text, round(float(prob), 2))
+        return [by_corner.get((box[0], box[2]), ("", 0.0)) for box in boxes]
 
 
     def _letter_contours(self) -> None:
@@ -135,13 +195,11 @@ class ImgProcessing:
         
         h,w = self.img.shape[:2]
 
-        # Block the player avatars at the top of the screen
-        ignoreBoxTop = (0, 0, w, int(h * 0.2)) 
-        x1, y1, x2, y2 = ignoreBoxTop
-        cv2.rectangle(self.img, (x1, y1), (x2, y2), color=(255, 255, 255), thickness=-1)  
-        
         # Preparing the image for processing
-        gray = cv2.cvtColor(self.img, cv2.COLOR_BGR2GRAY)
+        gray = to_gray(self.img)
+        
+        # Block the player avatars at the top of the screen, on the gray copy since the capture is read-only
+        gray[: int(h * 0.2) + 1, :] = 255
         
         blurred = cv2.GaussianBlur(gray, (5, 5), 0)
 
@@ -165,66 +223,24 @@ class ImgProcessing:
             
         self.contourRects.sort(key=lambda b : b[1]) # Sort the contours according to the y values
 
-    def _img_to_text(self):
+    def _letter_boxes(self) -> List[tuple[int, int, int, int, int, int]]:
         """
-        Converts found letter contours to text using OCR.
+        Turns the letter contours into square boxes, padded and centered on each
+        contour for better letter recognition. Contours spanning almost the entire
+        image width are skipped, they are likely not letters.
         
-        For each contour rectangle:
-        1. Expands and squares the bounding box with padding (for better letter recognition)
-        2. Preprocesses the image for better OCR accuracy
-        3. Attempts text recognition with pytesseract (Faster than easy OCR)
-        4. Falls back to EasyOCR if pytesseract fails
-        5. Stores letter text with center coordinates
-        
-        The method populates self.lettersInfo with tuples of (center_x, center_y, recognized_text).
+        Returns:
+            (center_x, center_y, x1, y1, x2, y2) of every letter, in the order of `contourRects`
         """
-
-        def preprocessContourRect(cropped_img):
-            """
-            Preprocesses individual letter images for OCR.
-            
-            Steps:
-            - Convert to grayscale
-            - Apply Gaussian blur for noise reduction
-            - Threshold to binary image
-            - Apply erosion to clarify certain letters such as I and O
-            
-            Args:
-                cropped_img: Cropped image region containing a potential letter
-                
-            Returns:
-                Preprocessed binary image ready for OCR
-            """
-            gray = cv2.cvtColor(cropped_img, cv2.COLOR_BGR2GRAY)
-
-            blur = cv2.GaussianBlur(gray, (5,5), 0)
-            _,thresh = cv2.threshold(blur, 140, 255, cv2.THRESH_BINARY)
-
-            # kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 1))
-            # erosion = cv2.dilate(thresh, kernel=kernel, iterations=1) # erodes the letter image (yes shows dilation but it is doing the opposite)
-            # cv2.imshow(f'{rect}', dilate)
-            return thresh
-        
         padding = 10
-        # if not self.img or len(self.img.shape) < 1:
-        #     return
-        
         _, imgW = self.img.shape[:2]
         
-        self.lettersInfo  = []
+        boxes = []
         for rect in self.contourRects :
             x,y,w,h = rect
             
             # Skip contours that span almost the entire image width (likely not letters)
             if (w >= 0.9*imgW): continue
-            
-            # Expand the bounding box with padding
-            x1, y1 = x , y
-            x2, y2 = x + w, y + h 
-
-            # Width and height of the expanded box
-            w = x2 - x1
-            h = y2 - y1
 
             # Calculate center of the contour
             cx = x + (w // 2)
@@ -236,27 +252,125 @@ class ImgProcessing:
             x2 = cx + (max_width // 2) + padding
             y1 = cy - (max_width // 2) - padding
             y2 = cy + (max_width // 2) + padding
+            boxes.append((cx, cy, x1, y1, x2, y2))
+        return boxes
+
+    def _img_to_text(self):
+        """
+        Converts found letter contours to text using OCR.
+        
+        For each contour rectangle:
+        1. Expands and squares the bounding box with padding (see `_letter_boxes`)
+        2. Preprocesses the image for better OCR accuracy
+        3. Looks the perceptual hash of every glyph up in the glyph cache, then
+           recognizes the other glyphs with the fast glyph classifier
+        4. Recognizes the letters the classifier isn't confident about at once with
+           EasyOCR, without its text detector :
+           - "crops" mode : upscaled crops of the letters (see `easyOCRbatch`)
+           - "frame" mode : the letter boxes on the whole preprocessed frame (see `easyOCRboxes`)
+           Confident EasyOCR results are learned by the classifier, confident
+           results are added to the glyph cache.
+        5. Stores letter text with center coordinates
+        
+        The method populates self.lettersInfo with tuples of (center_x, center_y, recognized_text).
+        """
+        boxes = self._letter_boxes()
+        imgH, imgW = self.img.shape[:2]
+        
+        # Extract and preprocess the letter regions, clipped to the borders of the frame
+        regions = [[max(x1, 0), min(x2, imgW), max(y1, 0), min(y2, imgH)] for _, _, x1, y1, x2, y2 in boxes]
+        if self.ocr_mode == "frame":
+            binary = preprocess_letters(self.img)
+            crops = [binary[y1 : y2, x1 : x2] for x1, x2, y1, y2 in regions]
+        else:
+            crops = [preprocess_letters(self.img[y1 : y2, x1 : x2]) for x1, x2, y1, y2 in regions]
+        
+        hashes = [glyph_hash(crop) for crop in crops]
+        self.glyph_hashes = {(cx, cy): key for (cx, cy, *_), key in zip(boxes, hashes) if key is not None}
+        self.glyph_crops = {(cx, cy): crop for (cx, cy, *_), crop in zip(boxes, crops)}
+        
+        results : List[tuple[str, float]] = [("", 0.0)] * len(crops)
+        unknown : List[int] = []
+        for i, key in enumerate(hashes):
+            cached = self.glyph_cache.get(key) if key is not None else None
+            if cached is not None:
+                results[i] = cached
+            else:
+                unknown.append(i)
+        
+        for i, (text, conf) in zip(unknown, self.classifier.classify([crops[i] for i in unknown])):
+            results[i] = (text, conf)
+            if hashes[i] is not None and conf >= self.classifier.min_confidence:
+                self.glyph_cache.put(hashes[i], text, conf)
+        pending = [i for i in unknown if results[i][1] < self.classifier.min_confidence]
+        
+        if pending:
+            if self.ocr_mode == "frame":
+                # The recognizer reads the regions straight from the frame
+                ocr = self.easyOCRboxes(binary, [regions[i] for i in pending])
+            else:
+                ocr = self.easyOCRbatch([cv2.resize(crops[i], None, fx=2.5, fy=2.5, interpolation=cv2.INTER_LINEAR)
+                                         for i in pending])
             
-            # Extract and preprocess the letter region
-            crop  = self.img[y1 : y2, x1 : x2]
-            preprocess = preprocessContourRect(crop)
-            resized = cv2.resize(preprocess, None, fx=2.5, fy=2.5, interpolation=cv2.INTER_LINEAR)
+            for i, (text, conf) in zip(pending, ocr):
+                results[i] = (text, conf)
+                label = re.sub(r"\s+", "", text).lower()
+                if conf >= LEARN_CONFIDENCE and label in GLYPH_LABELS:
+                    self.classifier.add(label, crops[i])
+                    if hashes[i] is not None:
+                        self.glyph_cache.put(hashes[i], label, conf)
             
-            # OCR with tesseract first
-            # text,conf =  self.pytesseractRes(resized)
-            # if (text == "" or conf < 0.4) :
-            text,conf =self.easyOCRres(resized) # Fallback to EasyOCR
-
+            if self.classifier.changed and self.glyphs_path:
+                self.classifier.save(self.glyphs_path)
+        
+        if unknown:
+            self.glyph_cache.save()
+        
+        # Results come back in the order of the boxes
+        self.lettersInfo  = []
+        for (cx, cy, *_), (text, conf) in zip(boxes, results):
             text = re.sub(r"\s+", "", text) # Clean the found text
             
             # Store letter information for grid placement
             info = (cx, cy, text)
             self.lettersInfo.append(info)
-            
-            # cv2.imshow(f"{rect}", resized)
-            # cv2.putText(self.img, f"{text}, {conf}", (x, y), cv2.FONT_HERSHEY_SIMPLEX, 1, (200, 200, 200), 2)
         
     
+    def learn_corrections(self, letter_grid : List[List[str]]) -> int:
+        """
+        Writes the letters corrected in the grid editor back to the glyph cache,
+        as authoritative labels, and teaches them to the glyph classifier.
+        
+        Args:
+            letter_grid: The letters of the grid editor, laid out like `contour_info_grid`
+        
+        Returns:
+            int: Number of corrected letters
+        """
+        if (len(letter_grid) != len(self.contour_info_grid) or
+            any(len(row) != len(scanned) for row, scanned in zip(letter_grid, self.contour_info_grid))):
+            return 0
+        
+        corrected = 0
+        for row, scanned in zip(letter_grid, self.contour_info_grid):
+            for col, (letter, (cx, cy, text)) in enumerate(zip(row, scanned)):
+                letter = letter.strip().lower()
+                key = self.glyph_hashes.get((cx, cy))
+                if letter == text.strip().lower() or letter == "" or key is None:
+                    continue
+                
+                self.glyph_cache.put(key, letter, 1.0, authoritative=True)
+                if letter in GLYPH_LABELS:
+                    self.classifier.add(letter, self.glyph_crops[(cx, cy)])
+                scanned[col] = (cx, cy, letter) # learned once, even if the grid is solved again
+                corrected += 1
+        
+        if corrected:
+            self.glyph_cache.save()
+            if self.glyphs_path:
+                self.classifier.save(self.glyphs_path)
+        return corrected
+    
     def _convert_to_letter_grid(self):
         """ 
         Arrages extracted letter info into a square grid based on their
@@ -278,31 +392,36 @@ class ImgProcessing:
         Executes the complete image processing pipeline to extract letters from game screenshot.
         
         The pipeline consists of:
-        1. Capturing game window screenshot
-        2. Loading the captured image
-        3. Detecting letter contours
-        4. Converting image regions to text
-        5. Organizing text into grid format
+        1. Capturing the game window from the capture backend
+        2. Detecting letter contours
+        3. Converting image regions to text
+        4. Organizing text into grid format
         
         Sets scanning flag to prevent concurrent operations during processing.
+        The seconds spent on each step are kept in `timings`.
         """
         self.app.is_scanning = True
+        self.timings = {}
+        start = time.perf_counter()
 
-        # Step 1: Capture game window screenshot
-        self._screenshot_window()
-        
-        # Step 2: Load captured image 
+        # Step 1: Capture the game window, straight into memory
+        if not self._screenshot_window():
+            self.contour_info_grid = []
+            self.app.is_scanning = False
+            return
+        self.timings["capture"] = time.perf_counter() - start
         
-        self.img = cv2.imread(self.image_path)
-                
-        # Step 3: Detect and extract letter contours from image
+        # Step 2: Detect and extract letter contours from image
         self._letter_contours()
+        self.timings["contours"] = time.perf_counter() - start - self.timings["capture"]
         
-        # Step 4: Perform OCR to convert image regions to text
+        # Step 3: Perform OCR to convert image regions to text
         self._img_to_text()
+        self.timings["ocr"] = time.perf_counter() - start - sum(self.timings.values())
         
-        # Step 5: Organize detected letters into grid structure
+        # Step 4: Organize detected letters into grid structure
         self._convert_to_letter_grid()
+        self.timings["total"] = time.perf_counter() - start
 
         # Reset scanning flag now that processing is complete
         self.app.is_scanning = False
@@ -0,0 +1,66 @@
+from __future__ import annotations
+from array import array
+from typing import Iterable, Iterator, List, Sequence
+
+
+class GridPath(Sequence):
+    __slots__ = ("cells", "colSize")
+
+    def __init__(self, cells : bytes | array, colSize : int) -> None:
+        """
+        Compact path of a word on the grid, stored as packed cell indices
+        (row * colSize + col) instead of a list of [row, col] lists.
+
+        It reads like the nested lists it replaces : `path[i]` is a (row, col)
+        tuple, so `path[0][0]` and `for row, col in path` keep working.
+
+        Args:
+            cells: The cell indices, one byte per cell when they all fit
+            colSize: Number of columns of the grid
+        """
+        self.cells = cells
+        self.colSize = colSize
+
+    @classmethod
+    def from_cells(cls, cells : Sequence[int], colSize : int) -> GridPath:
+        """ Packs a list of cell indices, grids of more than 256 cells take two bytes per cell """
+        try:
+            return cls(bytes(cells), colSize)
+        except ValueError:
+            return cls(array("H", cells), colSize)
+
+    @classmethod
+    def from_coordinates(cls, coordinates : Iterable[Sequence[int]], colSize : int) -> GridPath:
+        """ Packs [row, col] pairs """
+        return cls.from_cells([row * colSize + col for row, col in coordinates], colSize)
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def __getitem__(self, index):
+        if (isinstance(index, slice)):
+            return [divmod(cell, self.colSize) for cell in self.cells[index]]
+        return divmod(self.cells[index], self.colSize)
+
+    def __iter__(self) -> Iterator[tuple[int, int]]:
+        colSize : int = self.colSize
+        for cell in self.cells:
+            yield divmod(cell, colSize)
+
+    def __eq__(self, other : object) -> bool:
+        if (isinstance(other, GridPath)):
+            return self.colSize == other.colSize and list(self.cells) == list(other.cells)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((tuple(self.cells), self.colSize))
+
+    def __repr__(self) -> str:
+        return f"GridPath({self.tolist()})"
+
+    def __reduce__(self):
+        return (GridPath, (self.cells, self.colSize))
+
+    def tolist(self) -> List[List[int]]:
+        """ The path as [row, col] lists, for json """
+        return [list(divmod(cell, self.colSize)) for cell in self.cells]
@@ -0,0 +1,139 @@
+from __future__ import annotations
+import hashlib
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+from core.word_box_solver_algo import Trie, WORD_LIST_PATH, load_word_list
+from core.word_box_solver_dictionary import open_dictionary, source_checksum, write_dictionary
+
+
+@dataclass
+class DictionaryEntry:
+    """ How to load a registered dictionary, a subset only keeps the words of its parent """
+    source_path : Path
+    artifact_path : Path | None = None
+    parent : str | None = None
+
+
+class DictionaryRegistry:
+    def __init__(self) -> None:
+        """
+        Named dictionaries loaded on first use and kept side by side, so a
+        solver can switch between them with `WordBoxSolver.set_trie`.
+
+        A full word list is compiled once and memory mapped (see `Trie.load`).
+        Lists with the same content share one mapping. A subset of another list
+        (game-accepted words, a custom list...) keeps the words it shares with its
+        parent and is compiled to its own mapped dictionary, so it loads as fast
+        as a full list and can be searched by worker processes.
+        """
+        self.entries : Dict[str, DictionaryEntry] = {}
+        self.tries : Dict[str, Trie] = {}
+        self.mapped : Dict[bytes, Trie] = {} # loaded dictionaries by checksum
+        self.lock = threading.RLock()
+
+    def register(self, name : str, source_path : str | Path, artifact_path : str | Path | None = None,
+                 parent : str | None = None) -> None:
+        """
+        Adds a dictionary, nothing is loaded until it is used.
+        Registering a name again replaces it and unloads the previous one.
+
+        Args:
+            name: The name of the dictionary
+            source_path: The json list of words
+            artifact_path: The compiled dictionary, next to the source by default
+                (named after the parent word list for a subset)
+            parent: Build the list as a subset of this registered dictionary,
+                its words missing from the parent are dropped
+
+        Raises:
+            KeyError: If the parent is not registered
+        """
+        with self.lock:
+            if (parent is not None and parent not in self.entries):
+                raise KeyError(f"Unknown dictionary: {parent}")
+            self.unload(name)
+            self.entries[name] = DictionaryEntry(
+                Path(source_path), Path(artifact_path) if artifact_path is not None else None, parent
+            )
+
+    def names(self) -> List[str]:
+        return list(self.entries)
+
+    def get(self, name : str) -> Trie:
+        """
+        Returns the trie of a dictionary, loading it on first use.
+
+        Raises:
+            KeyError: If the dictionary is not registered
+        """
+        with self.lock:
+            trie = self.tries.get(name)
+            if (trie is not None):
+                return trie
+
+            entry = self.entries.get(name)
+            if (entry is None):
+                raise KeyError(f"Unknown dictionary: {name}")
+
+            if (entry.parent is not None):
+                trie = self._load_subset(self.get(entry.parent), entry)
+            else:
+                checksum : bytes = source_checksum(entry.source_path)
+                trie = self.mapped.get(checksum)
+                if (trie is None):
+                    trie = self.mapped[checksum] = Trie.load(entry.source_path, entry.artifact_path)
+
+            self.tries[name] = trie
+            return trie
+
+    def _load_subset(self, parent : Trie, entry : DictionaryEntry) -> Trie:
+        """
+        Maps the compiled dictionary of a subset, compiling it first if it is
+        missing or was built from a different subset or parent word list.
+        The artifact is keyed by the checksums of both lists.
+        """
+        checksum : bytes = hashlib.sha256(parent.checksum + source_checksum(entry.source_path)).digest()
+        trie = self.mapped.get(checksum)
+        if (trie is not None):
+            return trie
+
+        # Named after the parent too, the same list may be a subset of several dictionaries
+        artifact_path : Path = entry.artifact_path or entry.source_path.with_suffix(f".{parent.checksum.hex()[:12]}.wbdict")
+        compiled = open_dictionary(artifact_path, checksum)
+        if (compiled is None):
+            subset : set[str] = set(load_word_list(entry.source_path))
+            full = Trie([word for word in parent.words if word in subset])
+            full.createTrie()
+            write_dictionary(artifact_path, full, checksum)
+            compiled = open_dictionary(artifact_path, checksum)
+            if (compiled is None):
+                raise RuntimeError(f"Failed to compile the dictionary {artifact_path}")
+
+        trie = self.mapped[checksum] = Trie.from_dictionary(compiled)
+        return trie
+
+    def unload(self, name : str) -> None:
+        """
+        Forgets the loaded trie of a dictionary and of its subsets. A mapping is
+        closed by the garbage collector once no solver nor other name uses it.
+        """
+        with self.lock:
+            self.tries.pop(name, None)
+            for other, entry in self.entries.items():
+                if (entry.parent == name):
+                    self.unload(other)
+
+            used : set[int] = {id(trie) for trie in self.tries.values()}
+            for checksum, trie in list(self.mapped.items()):
+                if (id(trie) not in used):
+                    del self.mapped[checksum]
+
+
+def default_registry() -> DictionaryRegistry:
+    """ A registry holding the English word list under the name "english" """
+    registry = DictionaryRegistry()
+    registry.register("english", WORD_LIST_PATH)
+    return registry
@@ -0,0 +1,73 @@
+from __future__ import annotations
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict
+
+if TYPE_CHECKING:
+    from core.word_box_solver_algo import SolveState
+
+logger = logging.getLogger("word_box_solver")
+
+
+@dataclass
+class SolveStats:
+    """
+    Counters of a single solve, see `WordBoxSolver.solve`.
+
+    Attributes:
+        source: "search", "incremental", "parallel", "cache" or "unchanged" (the words
+            of the last solve were kept), how the words were obtained
+        engine: The search engine which ran, empty when nothing was searched
+        wall_time: Seconds spent in `solve`
+        cancelled: The solve was cancelled or ran out of time, the words are partial
+        expansions: Neighbor cells tried by the search
+        saved_expansions: Neighbor cells skipped thanks to the subtree masks and depths
+        transitions: Trie transitions followed from a tile
+        exhausted: Branches cut because every word below the node was already found
+        duplicates: Word nodes reached again after their word was found
+        words_by_length: Number of found words of each length
+        start_times: Seconds spent searching from each start cell (row * colSize + col),
+            only measured by a serial search from scratch
+    """
+    source : str = "search"
+    engine : str = ""
+    wall_time : float = 0.0
+    cancelled : bool = False
+    expansions : int = 0
+    saved_expansions : int = 0
+    transitions : int = 0
+    exhausted : int = 0
+    duplicates : int = 0
+    words_by_length : Dict[int, int] = field(default_factory=dict)
+    start_times : Dict[int, float] = field(default_factory=dict)
+
+    def read_state(self, state : SolveState) -> None:
+        """ Copies the counters of the search state """
+        self.expansions = state.expansions
+        self.saved_expansions = state.saved_expansions
+        self.transitions = state.transitions
+        self.exhausted = state.exhausted
+        self.duplicates = state.duplicates
+        if (state.start_times is not None):
+            self.start_times = dict(state.start_times)
+
+    def count_words(self, found_words : dict) -> None:
+        self.words_by_length = dict(sorted(Counter(len(word) for word, _ in found_words).items()))
+
+    def slowest_starts(self, count : int = 5) -> list[tuple[int, float]]:
+        """ The start cells which took the longest, slowest first """
+        return sorted(self.start_times.items(), key=lambda item: item[1], reverse=True)[:count]
+
+    def summary(self) -> str:
+        words : int = sum(self.words_by_length.values())
+        text : str = (f"{self.source}{f' ({self.engine})' if self.engine else ''}{' cancelled' if self.cancelled else ''} in {self.wall_time * 1000:.1f} ms : {words} words, "
+                      f"{self.expansions} expansions ({self.saved_expansions} saved), {self.transitions} transitions, "
+                      f"{self.exhausted} exhausted, {self.duplicates} duplicates")
+        if (self.start_times):
+            slowest = ", ".join(f"cell {cell} {seconds * 1000:.1f} ms" for cell, seconds in self.slowest_starts(3))
+            text += f", slowest starts : {slowest}"
+        return text
+
+    def log(self, level : int = logging.INFO) -> None:
+        logger.log(level, "Solved %s", self.summary())
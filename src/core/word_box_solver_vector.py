@@ -0,0 +1,240 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Iterable, List, Sequence
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from core.word_box_solver_algo import Trie
+
+# Letter code of padding and of characters outside a-z, no cell ever matches it
+NO_LETTER : int = 26
+
+
+def _letter_matrix(words : Sequence[str], chunk_size : int = 65536) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Lays the words out as one row of letter codes (0 for "a" to 25 for "z") per word id,
+    padded with NO_LETTER.
+
+    Returns:
+        The (word count, longest word) uint8 matrix and the length of every word
+    """
+    encoded : List[bytes] = [w.encode("utf-8") for w in words]
+    blob : np.ndarray = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    offsets : np.ndarray = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(w) for w in encoded], out=offsets[1:])
+
+    lengths : np.ndarray = np.diff(offsets)
+    width : int = int(lengths.max()) if len(lengths) else 0
+    letters : np.ndarray = np.full((len(lengths), width), NO_LETTER, dtype=np.uint8)
+
+    columns : np.ndarray = np.arange(width)
+    for start in range(0, len(lengths), chunk_size):
+        stop : int = min(start + chunk_size, len(lengths))
+        inside : np.ndarray = columns < lengths[start:stop, None]
+        codes : np.ndarray = blob[np.minimum(offsets[start:stop, None] + columns, len(blob) - 1)] - np.uint8(ord("a"))
+        inside &= codes < 26
+        letters[start:stop][inside] = codes[inside]
+    return letters, lengths
+
+
+class Bitboard:
+    def __init__(self, rowSize : int, colSize : int) -> None:
+        """
+        Sets of cells of a grid packed as bits (cell row * colSize + col) in uint64 words,
+        so the cells reached by many words are moved with a few shifts per word.
+        A stack of n sets is a (limbs, n) array, each limb holding 64 cells of every set.
+
+        Args:
+            rowSize: Number of rows of the grid
+            colSize: Number of columns of the grid, at most 63
+        """
+        self.colSize : int = colSize
+        self.cell_count : int = rowSize * colSize
+        self.limbs : int = (self.cell_count + 63) // 64
+
+        self.board : np.ndarray = self.cells(range(self.cell_count))
+        self.not_first_col : np.ndarray = self.cells(c for c in range(self.cell_count) if c % colSize != 0)
+        self.not_last_col : np.ndarray = self.cells(c for c in range(self.cell_count) if c % colSize != colSize - 1)
+
+    def cells(self, cells : Iterable[int]) -> np.ndarray:
+        """ The bitboard of the given cells, as a stack of one set """
+        bits : np.ndarray = np.zeros((self.limbs, 1), dtype=np.uint64)
+        for cell in cells:
+            bits[cell >> 6] |= np.uint64(1 << (cell & 63))
+        return bits
+
+    def _up(self, bits : np.ndarray, shift : int) -> np.ndarray:
+        """ Moves every cell `shift` cells forward """
+        out : np.ndarray = bits << np.uint64(shift)
+        if (self.limbs > 1):
+            out[1:] |= bits[:-1] >> np.uint64(64 - shift)
+        return out
+
+    def _down(self, bits : np.ndarray, shift : int) -> np.ndarray:
+        """ Moves every cell `shift` cells backward """
+        out : np.ndarray = bits >> np.uint64(shift)
+        if (self.limbs > 1):
+            out[:-1] |= bits[1:] << np.uint64(64 - shift)
+        return out
+
+    def neighbors(self, bits : np.ndarray) -> np.ndarray:
+        """ Cells next to (but not on) a cell of the set, for every set of a stack """
+        right : np.ndarray = self._up(bits & self.not_last_col, 1)
+        left : np.ndarray = self._down(bits & self.not_first_col, 1)
+        row : np.ndarray = bits | left | right
+        return (left | right | self._up(row, self.colSize) | self._down(row, self.colSize)) & self.board
+
+
+class VectorVerifier:
+    def __init__(self, trie : Trie) -> None:
+        """
+        Checks many candidate words against a grid at once with NumPy.
+
+        For every word and letter position, a bitboard holds the cells where
+        a tile can end that prefix of the word : the tile spells the last letters
+        of the prefix and, unless it starts the word, touches a cell reached by the
+        prefix before it. A word survives when its last position reaches a cell.
+        Candidates are kept in lexicographic order, so the words sharing a prefix
+        are contiguous and each bitboard is computed once per distinct prefix.
+
+        Cells may be reused along such a chain, so survivors still need an exact
+        check, but nearly every word that can't be spelled dies after a few letters.
+
+        Args:
+            trie: The dictionary the word ids refer to
+        """
+        self.trie : Trie = trie
+        self.letters, self.lengths = _letter_matrix(trie.words)
+
+        # Letter histogram of every word, only the words stored in the trie are candidates
+        self.histograms : np.ndarray = np.zeros((NO_LETTER, len(self.lengths)), dtype=np.uint8)
+        for letter in range(NO_LETTER):
+            self.histograms[letter] = (self.letters == letter).sum(axis=1)
+        word_ids : np.ndarray = np.frombuffer(trie.word_ids, dtype=np.int32)
+        self.valid : np.ndarray = np.zeros(len(self.lengths), dtype=bool)
+        self.valid[word_ids[word_ids >= 0]] = True
+
+        # Word ids in lexicographic order, letters are shifted so no code is a null byte
+        width : int = self.letters.shape[1]
+        keys : np.ndarray = (self.letters + np.uint8(1)).view(f"S{width}").ravel() if width else np.zeros(len(self.lengths))
+        self.order : np.ndarray = np.argsort(keys, kind="stable")
+
+        # One contiguous row of letters per position, gathered at every step of the search
+        self.columns : np.ndarray = np.ascontiguousarray(self.letters.T)
+
+    def candidates(self, letter_grid : List[List[str]]) -> np.ndarray:
+        """
+        Selects the words which only use letters of the grid, each at most
+        as many times as it appears on the grid, like `LetterIndex.candidates`.
+
+        Returns:
+            A boolean mask over the word ids
+        """
+        histogram : List[int] = [0] * NO_LETTER
+        for row in letter_grid:
+            for char in row:
+                for c in char:
+                    histogram[ord(c) - ord("a")] += 1
+
+        feasible : np.ndarray = self.valid.copy()
+        for letter in range(NO_LETTER):
+            if (histogram[letter] < 255):
+                feasible &= self.histograms[letter] <= histogram[letter]
+        return feasible
+
+    def survivors(self, letter_grid : List[List[str]], ids : Sequence[int] | None = None) -> List[int]:
+        """
+        Filters word ids down to the words the grid may spell.
+
+        Args:
+            letter_grid: 2D list of characters representing the game board
+            ids: Ids of the candidate words, the `candidates` of the grid by default
+
+        Returns:
+            List[int]: Ids of the words spelled by a chain of adjacent tiles, in increasing order
+        """
+        rowSize, colSize = len(letter_grid), len(letter_grid[0])
+        board = Bitboard(rowSize, colSize)
+
+        # Cells of every single letter tile, and of every multi-letter tile
+        single : np.ndarray = np.zeros((board.limbs, NO_LETTER + 1), dtype=np.uint64)
+        multi : dict[str, List[int]] = {}
+        for cell in range(rowSize * colSize):
+            char : str = letter_grid[cell // colSize][cell % colSize]
+            if (not (char.isascii() and char.isalpha() and char.islower())):
+                continue
+            if (len(char) == 1):
+                single[:, ord(char) - ord("a") : ord(char) - ord("a") + 1] |= board.cells([cell])
+            else:
+                multi.setdefault(char, []).append(cell)
+        tiles : List[tuple[np.ndarray, np.ndarray]] = [
+            (np.array([ord(c) - ord("a") for c in char], dtype=np.uint8), board.cells(cells)) for char, cells in multi.items()
+        ]
+        span : int = max([len(codes) for codes, _ in tiles], default=1) # positions a tile can cover
+
+        if (ids is None):
+            selected : np.ndarray = self.candidates(letter_grid)
+        else:
+            selected = np.zeros(len(self.lengths), dtype=bool)
+            selected[np.asarray(ids, dtype=np.int64)] = True
+        rows : np.ndarray = self.order[selected[self.order]]
+        lengths : np.ndarray = self.lengths[rows]
+
+        # The rows sharing a prefix form a group, boundary marks the first row of every group
+        boundary : np.ndarray = np.ones(len(rows), dtype=bool)
+        columns : List[np.ndarray] = [] # letter of every row at the previous positions, most recent first
+        groups : List[np.ndarray] = [] # group of every row at the previous positions, most recent first
+        reaches : List[np.ndarray] = [] # reach of every group at the previous positions, most recent first
+        found : List[np.ndarray] = []
+
+        for pos in range(self.letters.shape[1]):
+            if (len(rows) == 0):
+                break
+            column : np.ndarray = self.columns[pos][rows]
+            columns = [column] + columns[: span - 1]
+            boundary[1:] |= column[1:] != column[:-1]
+            heads : np.ndarray = np.flatnonzero(boundary)
+            group : np.ndarray = np.cumsum(boundary) - 1
+
+            reach : np.ndarray = single[:, column[heads]]
+            if (pos > 0):
+                reach &= board.neighbors(reaches[0])[:, groups[0][heads]]
+
+            for codes, cells in tiles:
+                size : int = len(codes)
+                if (pos + 1 < size):
+                    continue
+                spelled : np.ndarray = np.logical_and.reduce([columns[k][heads] == codes[size - 1 - k] for k in range(size)])
+                if (not spelled.any()):
+                    continue
+                if (pos + 1 == size):
+                    reach[:, spelled] |= cells
+                else:
+                    reach[:, spelled] |= board.neighbors(reaches[size - 1][:, groups[size - 1][heads[spelled]]]) & cells
+
+            groups = [group] + groups[: span - 1]
+            reaches = [reach] + reaches[: span - 1]
+            reached : List[np.ndarray] = [r.any(axis=0)[g] for r, g in zip(reaches, groups)]
+
+            done : np.ndarray = lengths == pos + 1
+            found.append(rows[done & reached[0]])
+
+            # Keep the unfinished words a tile can still extend, or still start when it spans several letters
+            keep : np.ndarray = ~done & (np.logical_or.reduce(reached) | (pos + 1 < span))
+            if (not keep.all()):
+                kept : np.ndarray = np.flatnonzero(keep)
+                boundary = np.ones(len(kept), dtype=bool)
+                boundary[1:] = group[kept[1:]] != group[kept[:-1]]
+                rows, lengths = rows[kept], lengths[kept]
+                columns = [c[kept] for c in columns]
+
+                # Renumber the groups still in use, the reach of the others is dropped
+                for k in range(len(groups)):
+                    group = groups[k][kept]
+                    used : np.ndarray = np.ones(len(group), dtype=bool)
+                    used[1:] = group[1:] != group[:-1]
+                    reaches[k] = reaches[k][:, group[used]]
+                    groups[k] = np.cumsum(used) - 1
+
+        survivors : np.ndarray = np.concatenate(found) if found else np.zeros(0, dtype=np.int64)
+        return np.sort(survivors).tolist()
@@ -0,0 +1,52 @@
+import random
+import sys
+from pathlib import Path
+from typing import List
+
+import pytest
+
+# The app runs from the src directory, its modules are imported as `core.*`
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from core.word_box_solver_algo import Trie  # noqa: E402
+
+# Frequent letters plus the letters of the multi-letter tiles, so grids spell many words
+ALPHABET : str = "aeeinorsttlqhu"
+TILES : List[str] = ["qu", "th"]
+
+
+def random_words(seed : int, count : int) -> List[str]:
+    """ Seeded word list of short strings, with duplicates and words the trie ignores """
+    rng = random.Random(seed)
+    words : List[str] = ["".join(rng.choice(ALPHABET) for _ in range(rng.randint(4, 8))) for _ in range(count)]
+    words += [w for w in ("quit", "quote", "this", "thin", "tenth", "quartet") if w not in words]
+    return words + words[:20] + ["abc", "Tent", "naïve"]
+
+
+def random_grid(rng : random.Random, rowSize : int, colSize : int, tile_rate : float = 0.0) -> List[List[str]]:
+    return [[rng.choice(TILES) if rng.random() < tile_rate else rng.choice(ALPHABET) for _ in range(colSize)]
+            for _ in range(rowSize)]
+
+
+@pytest.fixture(scope="session")
+def words() -> List[str]:
+    return random_words(seed=7, count=4000)
+
+
+@pytest.fixture(scope="session")
+def trie(words) -> Trie:
+    trie = Trie(words)
+    trie.createTrie()
+    return trie
+
+
+@pytest.fixture(scope="session")
+def mapped_trie(words, tmp_path_factory) -> Trie:
+    """ The same dictionary compiled to a file and memory mapped """
+    import json
+
+    directory = tmp_path_factory.mktemp("dictionary")
+    source = directory / "words.json"
+    source.write_text(json.dumps(words))
+    Trie.compile(source, directory / "words.wbdict")
+    return Trie.load(source, directory / "words.wbdict")
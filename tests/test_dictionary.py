@@ -0,0 +1,114 @@
+import json
+import random
+
+import pytest
+
+from conftest import random_grid
+from core.word_box_solver_algo import Trie, WordBoxSolver
+from core.word_box_solver_dictionary import (
+    BLOCK_SIZE, FrontCodedTable, front_code, open_dictionary, source_checksum
+)
+from core.word_box_solver_registry import DictionaryRegistry
+
+
+def table(words):
+    block_offsets, blob = front_code(words)
+    return FrontCodedTable(block_offsets, blob, len(words))
+
+
+@pytest.mark.parametrize("words", [
+    [],
+    ["solo"],
+    sorted(f"word{i:04d}" for i in range(3 * BLOCK_SIZE + 3)),
+    sorted(["zeta", "alpha", "alphabet", "beta", "alpha", "naïve", "é", "", "x" * 300, "x" * 299 + "y"], key=str.encode),
+])
+def test_front_coded_table_round_trip(words):
+    coded = table(words)
+    assert len(coded) == len(words)
+    assert [coded[i] for i in range(len(words))] == words
+    assert list(coded) == words
+    if (words):
+        assert coded[-1] == words[-1]
+    with pytest.raises(IndexError):
+        coded[len(words)]
+
+
+def test_front_coding_rejects_unsorted_words():
+    with pytest.raises(ValueError):
+        front_code(["beta", "alpha"])
+
+
+def test_full_compile_numbers_words_in_sorted_order(trie, words):
+    assert list(trie.words) == sorted({w for w in words if len(w) > 3 and w.isascii() and w.isalpha() and w.islower()})
+    assert sorted(i for i in trie.word_ids if i >= 0) == list(range(len(trie.words)))
+
+
+@pytest.fixture
+def word_list(tmp_path, words):
+    source = tmp_path / "words.json"
+    source.write_text(json.dumps(words))
+    return source
+
+
+def test_dictionary_artifact_round_trip(trie, word_list, tmp_path):
+    artifact = tmp_path / "words.wbdict"
+    Trie.compile(word_list, artifact)
+    mapped = Trie.load(word_list, artifact)
+
+    assert mapped.dictionary is not None
+    assert mapped.checksum == source_checksum(word_list)
+    assert list(mapped.words) == list(trie.words)
+    for name in ("child_masks", "first_child", "word_ids", "counts", "subtree_masks", "depths"):
+        assert list(getattr(mapped, name)) == list(getattr(trie, name)), name
+    assert mapped.letter_index.all_words == bytes(trie.letter_index.all_words)
+
+
+def test_outdated_or_truncated_artifact_is_recompiled(word_list, tmp_path):
+    artifact = tmp_path / "words.wbdict"
+    Trie.compile(word_list, artifact)
+    data : bytes = artifact.read_bytes()
+    checksum : bytes = source_checksum(word_list)
+
+    assert open_dictionary(artifact, bytes(32)) is None
+    for size in (0, 16, len(data) // 2):
+        artifact.write_bytes(data[:size])
+        assert open_dictionary(artifact, checksum) is None
+
+    assert Trie.load(word_list, artifact).dictionary is not None
+    assert artifact.read_bytes() == data
+
+
+def test_subset_dictionary_is_compiled_to_its_own_artifact(words, word_list, tmp_path):
+    subset_list = tmp_path / "subset.json"
+    subset_list.write_text(json.dumps(words[::3] + ["zzzznotinparent"]))
+
+    registry = DictionaryRegistry()
+    registry.register("full", word_list, tmp_path / "words.wbdict")
+    registry.register("subset", subset_list, parent="full")
+    subset = registry.get("subset")
+
+    assert subset.dictionary is not None
+    assert set(subset.words) == set(registry.get("full").words) & set(words[::3])
+
+    # A fresh registry maps the artifact, a changed subset is recompiled
+    artifact = subset.dictionary.path
+    modified : int = artifact.stat().st_mtime_ns
+    reloaded = DictionaryRegistry()
+    reloaded.register("full", word_list, tmp_path / "words.wbdict")
+    reloaded.register("subset", subset_list, parent="full")
+    assert list(reloaded.get("subset").words) == list(subset.words)
+    assert artifact.stat().st_mtime_ns == modified
+
+    subset_list.write_text(json.dumps(words[::5]))
+    reloaded.register("subset", subset_list, parent="full")
+    assert set(reloaded.get("subset").words) == set(registry.get("full").words) & set(words[::5])
+
+    # Workers map the artifact by path, so search the current subset
+    solver = WordBoxSolver(reloaded.get("subset"))
+    rng = random.Random(11)
+    try:
+        for _ in range(2):
+            letter_grid = random_grid(rng, 4, 4, 0.1)
+            assert solver.find_words(letter_grid, "iterative", workers=2) == solver.find_words(letter_grid, "iterative")
+    finally:
+        solver.close()
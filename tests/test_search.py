@@ -0,0 +1,164 @@
+import random
+from typing import Dict, List, Sequence, Set
+
+import pytest
+
+from conftest import random_grid
+from core.word_box_solver_algo import SolveState, WordBoxSolver, length_points
+from core.word_box_solver_cache import transform_grid
+
+ENGINES : List[str] = ["recursive", "iterative", "vector"]
+SHAPES : List[tuple[int, int, float]] = [(4, 4, 0.0), (5, 5, 0.15), (3, 6, 0.2), (6, 3, 0.0), (2, 7, 0.3)]
+
+
+def spells(letter_grid : List[List[str]], word : str) -> bool:
+    """ Brute force : tries every path of the grid spelling the word """
+    rowSize, colSize = len(letter_grid), len(letter_grid[0])
+
+    def extend(row : int, col : int, pos : int, visited : Set[tuple[int, int]]) -> bool:
+        tile : str = letter_grid[row][col]
+        if (not word.startswith(tile, pos)):
+            return False
+        pos += len(tile)
+        if (pos == len(word)):
+            return True
+        for dr in (-1, 0, 1):
+            for dc in (-1, 0, 1):
+                r, c = row + dr, col + dc
+                if ((dr or dc) and 0 <= r < rowSize and 0 <= c < colSize and (r, c) not in visited):
+                    if (extend(r, c, pos, visited | {(r, c)})):
+                        return True
+        return False
+
+    return any(extend(row, col, 0, {(row, col)}) for row in range(rowSize) for col in range(colSize))
+
+
+def reference_words(words : List[str], letter_grid : List[List[str]]) -> Set[str]:
+    """ Every word the solver should find : 4 letters or more, lower case ascii, spelled on the grid """
+    return {w for w in set(words) if len(w) > 3 and w.isascii() and w.isalpha() and w.islower() and spells(letter_grid, w)}
+
+
+def check_paths(found_words : Dict, words : Sequence[str], letter_grid : List[List[str]]) -> None:
+    """ Every path spells its word over distinct, adjacent cells and the word id points to the word """
+    for (word, wordId), path in found_words.items():
+        assert words[wordId] == word
+        cells = list(path)
+        assert len(set(cells)) == len(cells)
+        assert "".join(letter_grid[row][col] for row, col in cells) == word
+        for (r1, c1), (r2, c2) in zip(cells, cells[1:]):
+            assert max(abs(r1 - r2), abs(c1 - c2)) == 1
+
+
+def seeded_grids(seed : int):
+    rng = random.Random(seed)
+    return [random_grid(rng, rowSize, colSize, tile_rate) for rowSize, colSize, tile_rate in SHAPES]
+
+
+@pytest.mark.parametrize("prefilter", [False, True])
+@pytest.mark.parametrize("engine", ENGINES)
+def test_engines_match_brute_force(trie, words, engine, prefilter):
+    if (engine == "vector"):
+        pytest.importorskip("numpy")
+    solver = WordBoxSolver(trie)
+    tile_words : int = 0
+    for letter_grid in seeded_grids(seed=1):
+        found_words = solver.find_words(letter_grid, engine, prefilter)
+        assert {word for word, _ in found_words} == reference_words(words, letter_grid)
+        check_paths(found_words, trie.words, letter_grid)
+        tile_words += sum(any(len(letter_grid[row][col]) > 1 for row, col in path) for path in found_words.values())
+    assert tile_words > 0 # the multi-letter tiles were exercised
+
+
+def test_recursive_and_iterative_find_the_same_paths(trie):
+    solver = WordBoxSolver(trie)
+    for letter_grid in seeded_grids(seed=2):
+        recursive = solver.find_words(letter_grid, "recursive")
+        iterative = solver.find_words(letter_grid, "iterative")
+        assert list(recursive.items()) == list(iterative.items())
+
+
+def test_mapped_dictionary_matches_in_memory_trie(trie, mapped_trie):
+    for letter_grid in seeded_grids(seed=3):
+        assert (WordBoxSolver(mapped_trie).find_words(letter_grid, "iterative") ==
+                WordBoxSolver(trie).find_words(letter_grid, "iterative"))
+
+
+def test_cancelled_search_is_partial(trie):
+    letter_grid = seeded_grids(seed=4)[1]
+    state = SolveState(deadline=0.0)
+    found_words = WordBoxSolver(trie).find_words(letter_grid, "iterative", state=state)
+    assert state.cancelled
+    assert set(found_words) <= set(WordBoxSolver(trie).find_words(letter_grid, "iterative"))
+
+
+@pytest.mark.parametrize("symmetry", [(False, False, True), (True, False, False), (True, True, True)])
+def test_cache_answers_symmetric_grids(trie, words, symmetry):
+    solver = WordBoxSolver(trie)
+    letter_grid = seeded_grids(seed=5)[2]
+    solver.set_letter_grid(letter_grid)
+    solver.solve(engine="iterative")
+
+    transformed = transform_grid(letter_grid, symmetry)
+    solver.set_letter_grid(transformed)
+    stats = solver.solve(engine="iterative", incremental=False, collect_stats=True)
+    assert stats.source == "cache"
+    assert {word for word, _ in solver.found_words} == reference_words(words, transformed)
+    check_paths(solver.found_words, trie.words, transformed)
+
+
+@pytest.mark.parametrize("edits", [1, 2, 3])
+def test_incremental_solve_matches_full_search(trie, words, edits):
+    rng = random.Random(edits)
+    solver = WordBoxSolver(trie)
+    for letter_grid in seeded_grids(seed=6):
+        solver.set_letter_grid(letter_grid)
+        solver.solve(engine="iterative")
+
+        edited = [row[:] for row in letter_grid]
+        colSize : int = len(edited[0])
+        for cell in rng.sample(range(len(edited) * colSize), edits):
+            edited[cell // colSize][cell % colSize] = rng.choice(["a", "e", "t", "qu", "th"])
+        solver.set_letter_grid(edited)
+        stats = solver.solve(engine="iterative", incremental=True, collect_stats=True)
+
+        assert stats.source == "incremental"
+        assert {word for word, _ in solver.found_words} == reference_words(words, edited)
+        check_paths(solver.found_words, trie.words, edited)
+        assert set(solver.found_words) == set(WordBoxSolver(trie).find_words(edited, "iterative"))
+
+
+def test_stream_budget_bounds_the_first_tier(trie):
+    solver = WordBoxSolver(trie)
+    solver.set_letter_grid(random_grid(random.Random(8), 12, 12))
+    streamed = list(solver.solve_stream(time_budget=0.0))
+    assert solver.cancelled
+    assert len(streamed) < len(WordBoxSolver(trie).find_words(solver.letter_grid, "iterative"))
+    assert solver.solved_grid == []
+
+
+def test_top_words_are_the_best_scoring_words(trie):
+    solver = WordBoxSolver(trie)
+    for letter_grid in seeded_grids(seed=9):
+        found_words = solver.find_words(letter_grid, "iterative")
+        best = sorted((length_points(len(word)) for word, _ in found_words), reverse=True)[:5]
+        top = solver.top_words(letter_grid, k=5)
+        assert [points for points, _, _ in top] == best
+        assert all(key in found_words for _, key, _ in top)
+        assert solver.top_words(letter_grid, k=0) == []
+
+
+def test_length_points_has_no_word_under_four_letters():
+    assert [length_points(n) for n in range(10)] == [0, 0, 0, 0, 1, 2, 3, 5, 11, 14]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_parallel_search_matches_serial_search(mapped_trie, engine):
+    if (engine == "vector"):
+        pytest.importorskip("numpy")
+    solver = WordBoxSolver(mapped_trie)
+    try:
+        for letter_grid in seeded_grids(seed=10)[:3]:
+            assert (list(solver.find_words(letter_grid, engine, workers=2).items()) ==
+                    list(solver.find_words(letter_grid, engine).items()))
+    finally:
+        solver.close()